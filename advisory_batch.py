@@ -0,0 +1,78 @@
+"""
+advisory_batch.py
+Offline grading of stored agronomy answers.
+
+Runs the same safety/escalation rules as the live app over a whole corpus in
+one batch scan, e.g. to re-grade historical advisories after the keyword
+lists change.
+
+Usage:
+    python advisory_batch.py answers.jsonl [--out graded.jsonl]
+
+Each input line is a JSON object with an "answer" field, or a bare JSON string.
+"""
+
+import argparse
+import json
+from collections import Counter
+from typing import Iterable, List
+
+from advisory_rules import level_for_categories, scan_answers
+from logging_config import get_logger
+
+logger = get_logger("advisory_batch")
+
+
+def grade_answers(answers: Iterable[str]) -> List[dict]:
+    """
+    Grade many answers with a single batch keyword scan.
+    
+    Args:
+        answers: LLM response texts
+        
+    Returns:
+        One dict per answer with escalation level and warning flags
+    """
+    return [
+        {
+            "level": level_for_categories(categories).value,
+            "pesticide_warning": "pesticide" in categories,
+            "uncertain": "hedge" in categories,
+        }
+        for categories in scan_answers(answers)
+    ]
+
+
+def _read_answers(path: str) -> List[str]:
+    """Read answers from a JSON-lines file."""
+    answers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            answers.append(record["answer"] if isinstance(record, dict) else record)
+    return answers
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Re-grade stored agronomy answers.")
+    parser.add_argument("answers", help="JSON-lines file of answers")
+    parser.add_argument("--out", help="Write per-answer grades as JSON lines")
+    args = parser.parse_args(argv)
+
+    answers = _read_answers(args.answers)
+    grades = grade_answers(answers)
+    logger.info("Graded %d answers", len(grades))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for grade in grades:
+                f.write(json.dumps(grade) + "\n")
+
+    for level, count in Counter(g["level"] for g in grades).most_common():
+        print(f"{level:8} {count}")
+
+
+if __name__ == "__main__":
+    main()
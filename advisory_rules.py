@@ -6,6 +6,9 @@ Includes escalation level assessment.
 """
 
 from enum import Enum
+from typing import Iterable, List, Set
+
+from keyword_matcher import KeywordMatcher
 from logging_config import get_logger
 
 logger = get_logger("advisory_rules")
@@ -19,25 +22,64 @@ class EscalationLevel(Enum):
     UNKNOWN = "unknown"       # Can't assess
 
 
+PESTICIDE_KEYWORDS = frozenset({
+    "spray", "fungicide", "insecticide", "pesticide", "treat with",
+    "apply chemical", "copper", "neem", "imidacloprid", "pyrethrin"
+})
+
+HEDGE_KEYWORDS = frozenset({
+    "not sure", "could be", "might be", "possibly",
+    "unclear", "cannot confirm", "can't confirm",
+    "looks similar to", "resembles", "possibly indicates"
+})
+
+HIGH_RISK_WORDS = frozenset({"severe", "widespread", "blighting"})
+
+HIGH_RISK_PHRASES = frozenset({
+    "wilting widely", "heavy infestation", "complete loss",
+    "should see agronomist", "definitely consult", "serious concern"
+})
+
+HIGH_RISK_KEYWORDS = HIGH_RISK_WORDS | HIGH_RISK_PHRASES
+
+# One automaton for all vocabularies (words and phrases): the answer is scanned once
+_MATCHER = KeywordMatcher({
+    "pesticide": PESTICIDE_KEYWORDS,
+    "hedge": HEDGE_KEYWORDS,
+    "high_risk": HIGH_RISK_KEYWORDS,
+})
+
+
+def _scan(lowered: str) -> Set[str]:
+    """
+    Return which keyword categories ("pesticide", "hedge", "high_risk") occur.
+    
+    Args:
+        lowered: Answer text, already lowercased by the caller
+    """
+    return _MATCHER.categories(lowered)
+
+
+def level_for_categories(categories: Set[str]) -> EscalationLevel:
+    """Map scanned keyword categories to an escalation level."""
+    if "high_risk" in categories:
+        return EscalationLevel.HIGH
+    
+    # Medium risk: chemicals or uncertainty
+    if "pesticide" in categories or "hedge" in categories:
+        return EscalationLevel.MEDIUM
+    
+    return EscalationLevel.LOW
+
+
 def _needs_pesticide_disclaimer(text: str) -> bool:
     """Check if response mentions chemical treatments."""
-    pesticide_keywords = [
-        "spray", "fungicide", "insecticide", "pesticide", "treat with",
-        "apply chemical", "copper", "neem", "imidacloprid", "pyrethrin"
-    ]
-    lowered = text.lower()
-    return any(word in lowered for word in pesticide_keywords)
+    return "pesticide" in _scan(text.lower())
 
 
 def _sounds_uncertain(text: str) -> bool:
     """Check if response expresses uncertainty."""
-    hedges = [
-        "not sure", "could be", "might be", "possibly",
-        "unclear", "cannot confirm", "can't confirm",
-        "looks similar to", "resembles", "possibly indicates"
-    ]
-    lowered = text.lower()
-    return any(h in lowered for h in hedges)
+    return "hedge" in _scan(text.lower())
 
 
 def _assess_escalation_level(raw_answer: str) -> EscalationLevel:
@@ -50,76 +92,101 @@ def _assess_escalation_level(raw_answer: str) -> EscalationLevel:
     Returns:
         EscalationLevel enum value
     """
-    text = raw_answer.lower()
-    
-    # High risk keywords
-    high_risk_keywords = [
-        "severe", "widespread", "blighting", "wilting widely",
-        "heavy infestation", "complete loss", "should see agronomist",
-        "definitely consult", "serious concern"
-    ]
-    
-    if any(k in text for k in high_risk_keywords):
-        return EscalationLevel.HIGH
-    
-    # Medium risk: chemicals or uncertainty
-    if _needs_pesticide_disclaimer(text) or _sounds_uncertain(text):
-        return EscalationLevel.MEDIUM
+    return level_for_categories(_scan(raw_answer.lower()))
+
+
+def scan_answers(answers: Iterable[str]) -> List[Set[str]]:
+    """
+    Scan many answers at once, e.g. when re-grading stored advisories.
+    Uses the matcher's batch scan (Hyperscan when installed).
     
-    return EscalationLevel.LOW
+    Args:
+        answers: LLM response texts
+        
+    Returns:
+        Keyword categories found in each answer, in input order
+    """
+    return _MATCHER.categories_many([answer.lower() for answer in answers])
 
 
-def _pesticide_warning() -> str:
-    """Return pesticide safety message."""
-    return (
-        "⚠️ PESTICIDE SAFETY:\n"
-        "- Read the product label carefully\n"
-        "- Follow local regulations and restrictions\n"
-        "- Wear gloves, mask, and eye protection\n"
-        "- Avoid spraying in mid-day heat or before rain\n"
-        "- Keep children and pets away from treated areas\n"
-        "- Dispose of empty containers properly"
-    )
-
-
-def _escalation_guidance() -> str:
-    """Return escalation message for uncertain diagnosis."""
-    return (
-        "❓ UNCERTAIN DIAGNOSIS:\n"
-        "The diagnosis above is not definitive. Before taking action:\n"
-        "1) Take clear, close-up photos of affected areas\n"
-        "2) Bring a fresh sample (leaf/fruit/insect) to your local:\n"
-        "   - Agriculture extension office\n"
-        "   - Cooperative farming service\n"
-        "   - Licensed agronomist\n"
-        "3) Let them confirm before treating the entire field"
-    )
-
-
-def _get_disclaimer_for_level(level: EscalationLevel) -> str:
-    """Return level-appropriate disclaimer."""
-    if level == EscalationLevel.HIGH:
-        return (
-            "⚠️ IMPORTANT DISCLAIMER:\n"
-            "This condition may require professional intervention. "
-            "Bring samples to a licensed agronomist or extension officer "
-            "before attempting treatment. Crop loss may occur if action is delayed."
-        )
-    elif level == EscalationLevel.MEDIUM:
-        return (
-            "⚠️ DISCLAIMER:\n"
-            "This tool provides general crop guidance. "
-            "Always confirm pesticide products, rates, and safety measures "
-            "with a licensed agronomist before applying any chemicals. "
-            "Follow local regulations and product labels."
-        )
-    else:
-        return (
-            "📋 DISCLAIMER:\n"
-            "This tool provides general crop guidance based on your description. "
-            "While these recommendations are low-risk, monitor your field closely "
-            "and consult an agronomist if the problem persists or worsens."
-        )
+def assess_escalation_levels(answers: Iterable[str]) -> List[EscalationLevel]:
+    """
+    Assess many answers at once (see scan_answers).
+    
+    Args:
+        answers: LLM response texts
+        
+    Returns:
+        EscalationLevel for each answer, in input order
+    """
+    return [level_for_categories(cats) for cats in scan_answers(answers)]
+
+
+# Fixed message blocks, built once at import
+_PESTICIDE_WARNING = (
+    "⚠️ PESTICIDE SAFETY:\n"
+    "- Read the product label carefully\n"
+    "- Follow local regulations and restrictions\n"
+    "- Wear gloves, mask, and eye protection\n"
+    "- Avoid spraying in mid-day heat or before rain\n"
+    "- Keep children and pets away from treated areas\n"
+    "- Dispose of empty containers properly"
+)
+
+_ESCALATION_GUIDANCE = (
+    "❓ UNCERTAIN DIAGNOSIS:\n"
+    "The diagnosis above is not definitive. Before taking action:\n"
+    "1) Take clear, close-up photos of affected areas\n"
+    "2) Bring a fresh sample (leaf/fruit/insect) to your local:\n"
+    "   - Agriculture extension office\n"
+    "   - Cooperative farming service\n"
+    "   - Licensed agronomist\n"
+    "3) Let them confirm before treating the entire field"
+)
+
+_LOW_RISK_DISCLAIMER = (
+    "📋 DISCLAIMER:\n"
+    "This tool provides general crop guidance based on your description. "
+    "While these recommendations are low-risk, monitor your field closely "
+    "and consult an agronomist if the problem persists or worsens."
+)
+
+_LEVEL_DISCLAIMERS = {
+    EscalationLevel.HIGH: (
+        "⚠️ IMPORTANT DISCLAIMER:\n"
+        "This condition may require professional intervention. "
+        "Bring samples to a licensed agronomist or extension officer "
+        "before attempting treatment. Crop loss may occur if action is delayed."
+    ),
+    EscalationLevel.MEDIUM: (
+        "⚠️ DISCLAIMER:\n"
+        "This tool provides general crop guidance. "
+        "Always confirm pesticide products, rates, and safety measures "
+        "with a licensed agronomist before applying any chemicals. "
+        "Follow local regulations and product labels."
+    ),
+    EscalationLevel.LOW: _LOW_RISK_DISCLAIMER,
+}
+
+
+def _build_suffix(pesticide: bool, hedge: bool, level: EscalationLevel) -> str:
+    """Join the message blocks appended after the answer for one combination."""
+    parts = [""]
+    if pesticide:
+        parts.append(_PESTICIDE_WARNING)
+    if hedge:
+        parts.append(_ESCALATION_GUIDANCE)
+    parts.append(_LEVEL_DISCLAIMERS.get(level, _LOW_RISK_DISCLAIMER))
+    return "\n\n".join(parts)
+
+
+# Every (pesticide, hedge, level) tail, fully joined once at import
+_SUFFIXES = {
+    (pesticide, hedge, level): _build_suffix(pesticide, hedge, level)
+    for pesticide in (False, True)
+    for hedge in (False, True)
+    for level in EscalationLevel
+}
 
 
 def apply_safety_and_escalation(raw_answer: str) -> str:
@@ -139,24 +206,17 @@ def apply_safety_and_escalation(raw_answer: str) -> str:
         logger.warning("Empty response to apply safety rules to")
         return "Unable to process the analysis. Please try again."
     
-    final_parts = [raw_answer.strip()]
+    # Lowercase once; every detector works on this copy
+    lowered = raw_answer.lower()
+    categories = _scan(lowered)
     
     # Assess severity
-    level = _assess_escalation_level(raw_answer)
-    logger.info(f"Escalation level: {level.value}")
-    
-    # Add pesticide warning if needed
-    if _needs_pesticide_disclaimer(raw_answer):
-        final_parts.append(_pesticide_warning())
-    
-    # Add escalation guidance if uncertain
-    if _sounds_uncertain(raw_answer):
-        final_parts.append(_escalation_guidance())
-    
-    # Add level-appropriate final disclaimer
-    final_parts.append(_get_disclaimer_for_level(level))
+    level = level_for_categories(categories)
+    logger.info("Escalation level: %s", level.value)
     
-    result = "\n\n".join(final_parts)
-    logger.info(f"Safety rules applied. Final length: {len(result)} chars")
+    # Pesticide warning, uncertainty guidance and level disclaimer, prejoined
+    suffix = _SUFFIXES[("pesticide" in categories, "hedge" in categories, level)]
+    result = raw_answer.strip() + suffix
+    logger.info("Safety rules applied. Final length: %d chars", len(result))
     
     return result
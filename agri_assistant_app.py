@@ -9,14 +9,24 @@ Simplified, intelligent UI:
 """
 
 import os
-import re
+from collections import Counter
+from concurrent.futures import wait
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
 import gradio as gr
 
-from advisory_rules import apply_safety_and_escalation
-from eye_of_the_agronomist import analyze_crop_issue
-from voice_of_the_agronomist import agronomist_response_to_speech
-from voice_of_the_farmer import transcribe_farmer_audio
+# Probe once at import; the handler just checks the flag
+try:
+    import soundfile as sf
+    _SOUNDFILE_OK = True
+except ImportError:
+    _SOUNDFILE_OK = False
+
+from keyword_matcher import KeywordMatcher
 from utils_audio import ensure_dir
+from utils_concurrency import EXECUTOR
 from logging_config import get_logger
 
 logger = get_logger("agri_assistant_app")
@@ -46,69 +56,125 @@ PLANT_PART_KEYWORDS = {
     "insect/pest": ["insect", "pest", "bug", "worm", "beetle", "aphid", "caterpillar", "hole", "webbing", "egg"],
 }
 
+# Compiled once over both maps: crop and plant part come from a single pass
+# over the text. Categories are ("crop", name) / ("part", name).
+_DETECTION_MATCHER = KeywordMatcher({
+    **{("crop", crop): kws for crop, kws in CROP_KEYWORDS.items()},
+    **{("part", part): kws for part, kws in PLANT_PART_KEYWORDS.items()},
+})
+
 ensure_dir(OUTPUT_AUDIO_DIR)
 
 
-def detect_crop_from_text(text: str) -> str:
+@lru_cache(maxsize=1)
+def _backends() -> SimpleNamespace:
     """
-    Intelligently detect crop type from farmer's description.
+    Import the analysis backends on first use so the UI starts quickly.
+    Later calls return the cached namespace.
+    """
+    from advisory_rules import apply_safety_and_escalation
+    from eye_of_the_agronomist import analyze_crop_issue, DEFAULT_LAT, DEFAULT_LON
+    from voice_of_the_agronomist import agronomist_response_to_audio
+    from voice_of_the_farmer import transcribe_farmer_audio
+    from weather_client import fetch_weather_snapshot
+
+    return SimpleNamespace(
+        apply_safety_and_escalation=apply_safety_and_escalation,
+        analyze_crop_issue=analyze_crop_issue,
+        agronomist_response_to_audio=agronomist_response_to_audio,
+        transcribe_farmer_audio=transcribe_farmer_audio,
+        fetch_weather_snapshot=fetch_weather_snapshot,
+        default_location=(DEFAULT_LAT, DEFAULT_LON),
+    )
+
+
+def _scores_by_kind(scores: Counter) -> Dict[str, Counter]:
+    """
+    Split combined detection scores into one Counter per kind.
     
     Args:
-        text: Farmer's description of the problem
+        scores: Match counts from _DETECTION_MATCHER.scores(), in definition order
         
     Returns:
-        Detected crop type, or "other" if uncertain
+        {"crop": Counter, "part": Counter} of category name -> matches,
+        still in definition order
     """
-    if not text:
-        return "other"
-    
-    text_lower = text.lower()
-    
-    # Score each crop based on keyword matches
-    crop_scores = {}
-    for crop, keywords in CROP_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text_lower)
-        if score > 0:
-            crop_scores[crop] = score
-    
-    if crop_scores:
-        detected_crop = max(crop_scores, key=crop_scores.get)
-        logger.info(f"Detected crop from text: {detected_crop}")
-        return detected_crop
+    by_kind = {"crop": Counter(), "part": Counter()}
+    for (kind, name), count in scores.items():
+        by_kind[kind][name] = count
+    return by_kind
+
+
+def _best_category(scores: Counter) -> Optional[str]:
+    """
+    Return the category with the most keyword matches.
+    Ties go to the category defined first (most_common is stable).
     
-    return "other"
+    Args:
+        scores: Match counts for one kind, in definition order
+        
+    Returns:
+        Best-scoring category name, or None if nothing matched
+    """
+    best = scores.most_common(1)
+    return best[0][0] if best else None
 
 
-def detect_plant_part_from_text(text: str) -> str:
+def detect_crop_and_plant_part(text: str, lowered: Optional[str] = None) -> Tuple[str, str]:
     """
-    Intelligently detect plant part from farmer's description.
+    Detect crop type and plant part from the farmer's description in one scan.
     
     Args:
         text: Farmer's description of the problem
+        lowered: text.lower(), if the caller already computed it
         
     Returns:
-        Detected plant part, or "leaf" as default
+        (crop, plant_part); "other" and "leaf" when uncertain
     """
     if not text:
-        return "leaf"
+        return "other", "leaf"
     
-    text_lower = text.lower()
+    if lowered is None:
+        lowered = text.lower()
     
-    # Score each part based on keyword matches
-    part_scores = {}
-    for part, keywords in PLANT_PART_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text_lower)
-        if score > 0:
-            part_scores[part] = score
+    scores = _scores_by_kind(_DETECTION_MATCHER.scores(lowered))
+    detected_crop = _best_category(scores["crop"])
+    detected_part = _best_category(scores["part"])
+    if detected_crop:
+        logger.info("Detected crop from text: %s", detected_crop)
+    if detected_part:
+        logger.info("Detected plant part from text: %s", detected_part)
     
-    if part_scores:
-        detected_part = max(part_scores, key=part_scores.get)
-        logger.info(f"Detected plant part from text: {detected_part}")
-        return detected_part
+    # Default to leaf if uncertain
+    return detected_crop or "other", detected_part or "leaf"
+
+
+def detect_crop_from_text(text: str, lowered: Optional[str] = None) -> str:
+    """
+    Intelligently detect crop type from farmer's description.
     
-    return "leaf"  # Default to leaf if uncertain
+    Args:
+        text: Farmer's description of the problem
+        lowered: text.lower(), if the caller already computed it
+        
+    Returns:
+        Detected crop type, or "other" if uncertain
+    """
+    return detect_crop_and_plant_part(text, lowered)[0]
 
 
+def detect_plant_part_from_text(text: str, lowered: Optional[str] = None) -> str:
+    """
+    Intelligently detect plant part from farmer's description.
+    
+    Args:
+        text: Farmer's description of the problem
+        lowered: text.lower(), if the caller already computed it
+        
+    Returns:
+        Detected plant part, or "leaf" as default
+    """
+    return detect_crop_and_plant_part(text, lowered)[1]
 
 
 def analyze_handler(
@@ -128,6 +194,8 @@ def analyze_handler(
         (advice_text, audio_path, detected_info) tuple
     """
     try:
+        backends = _backends()
+
         if not crop_image:
             error_msg = "📸 Please upload a crop image to analyze."
             logger.warning(error_msg)
@@ -136,7 +204,13 @@ def analyze_handler(
         # Get farmer description (text or audio)
         if (not farmer_text or farmer_text.strip() == "") and farmer_audio is not None:
             logger.info("Transcribing farmer audio...")
-            farmer_text = transcribe_farmer_audio(farmer_audio)
+            # Warm the weather cache while the audio is transcribed, then wait
+            # for it so the analysis below gets a cache hit
+            weather_future = EXECUTOR.submit(
+                backends.fetch_weather_snapshot, *backends.default_location
+            )
+            farmer_text = backends.transcribe_farmer_audio(farmer_audio)
+            wait((weather_future,))
         
         if not farmer_text or farmer_text.strip() == "":
             error_msg = "🗣️ Please describe the problem (text or voice)."
@@ -144,15 +218,14 @@ def analyze_handler(
             return error_msg, None, "No description provided"
         
         # Intelligently detect crop and plant part from description
-        detected_crop = detect_crop_from_text(farmer_text)
-        detected_part = detect_plant_part_from_text(farmer_text)
+        detected_crop, detected_part = detect_crop_and_plant_part(farmer_text)
         
         detection_info = f"🔍 Detected: {detected_crop.title()} - {detected_part}"
-        logger.info(f"Analysis started: crop={detected_crop}, part={detected_part}")
+        logger.info("Analysis started: crop=%s, part=%s", detected_crop, detected_part)
         
         # Step 1: Vision + LLM reasoning
         logger.debug("Calling crop issue analyzer...")
-        raw_answer = analyze_crop_issue(
+        raw_answer = backends.analyze_crop_issue(
             image_path=crop_image,
             farmer_text=farmer_text,
             crop_type=detected_crop,
@@ -161,51 +234,47 @@ def analyze_handler(
         
         # Step 2: Add safety and escalation guidance
         logger.debug("Applying safety rules...")
-        safe_answer = apply_safety_and_escalation(raw_answer)
+        safe_answer = backends.apply_safety_and_escalation(raw_answer)
         
         # Step 3: Synthesize audio
         logger.debug("Generating speech...")
         preferred_audio_path = OUTPUT_AUDIO_PATH
-        # agronomist_response_to_speech may return a different path (local fallback), capture it
+        # The TTS may return a different path (local fallback), capture it.
+        # It also hands back the audio itself when it already has it in memory.
+        in_memory_audio = None
         try:
-            returned_audio_path = agronomist_response_to_speech(safe_answer, preferred_audio_path)
+            returned_audio_path, in_memory_audio = backends.agronomist_response_to_audio(
+                safe_answer, preferred_audio_path
+            )
         except Exception as e:
-            logger.warning(f"TTS generation raised an error: {e}")
+            logger.warning("TTS generation raised an error: %s", e)
             returned_audio_path = preferred_audio_path
 
-        # Prefer the returned path if present
+        if in_memory_audio is not None:
+            logger.info("Analysis complete. Returning in-memory audio")
+            return safe_answer, in_memory_audio, detection_info
+
+        # Prefer the returned path if present. Every TTS tier writes the file
+        # synchronously before returning, so it can be read right away.
         audio_path_to_read = returned_audio_path or preferred_audio_path
 
-        # Wait shortly for the file to be written to disk (pyttsx3 may write asynchronously)
-        try:
-            import time
-            wait_seconds = 3.0
-            interval = 0.2
-            elapsed = 0.0
-            while (not os.path.exists(audio_path_to_read) or os.path.getsize(audio_path_to_read) == 0) and elapsed < wait_seconds:
-                time.sleep(interval)
-                elapsed += interval
-        except Exception:
-            # best-effort wait; proceed to read and handle errors below
-            pass
+        if not _SOUNDFILE_OK:
+            logger.warning("soundfile not available, returning file path")
+            return safe_answer, audio_path_to_read, detection_info
 
         # Read audio file and return as tuple for Gradio
         try:
-            import soundfile as sf
             audio_data, sample_rate = sf.read(audio_path_to_read)
-            logger.info(f"Analysis complete. Returning audio from {audio_path_to_read}")
+            logger.info("Analysis complete. Returning audio from %s", audio_path_to_read)
             return safe_answer, (sample_rate, audio_data), detection_info
-        except ImportError:
-            logger.warning("soundfile not available, returning file path")
-            return safe_answer, audio_path_to_read, detection_info
         except Exception as e:
-            logger.warning(f"Could not read audio file {audio_path_to_read}: {e}")
+            logger.warning("Could not read audio file %s: %s", audio_path_to_read, e)
             # Fall back to returning the file path so Gradio can still attempt playback
             return safe_answer, audio_path_to_read, detection_info
     
     except Exception as e:
         error_msg = f"❌ Analysis failed: {str(e)}"
-        logger.error(f"{error_msg}\n{type(e).__name__}: {e}", exc_info=True)
+        logger.error("%s\n%s: %s", error_msg, type(e).__name__, e, exc_info=True)
         return error_msg, None, "Error occurred"
 
 
@@ -0,0 +1,24 @@
+"""
+config.py
+Loads settings from the .env file into the environment, once per process.
+Modules call load_env() before reading os.getenv(); repeat calls (other
+modules, reloads) are free.
+"""
+
+import threading
+
+from dotenv import load_dotenv
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load .env into os.environ the first time this is called."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            load_dotenv()
+            _loaded = True
@@ -5,21 +5,80 @@ Calls LLM for agronomy reasoning.
 """
 
 import base64
+import mmap
 import os
 import re
-from typing import Optional
-from dotenv import load_dotenv
+import time
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import imagesize
+    _HAS_IMAGESIZE = True
+except ImportError:
+    _HAS_IMAGESIZE = False
 
 from llm_client import get_llm_client
-from weather_client import fetch_weather_snapshot
+from utils_concurrency import EXECUTOR
+from weather_client import fetch_weather_snapshot, get_cached_snapshot
+from config import load_env
 from logging_config import get_logger
 
 logger = get_logger("eye_of_the_agronomist")
 
-load_dotenv()
+load_env()
 
 REGION_HINT = os.getenv("REGION_HINT", "unspecified region")
 
+# Raw bytes per streamed base64 chunk; a multiple of 3 so chunks concatenate
+# into exactly the same string as a one-shot b64encode (no inner padding)
+BASE64_CHUNK_BYTES = 48 * 1024
+
+# Bulk runs with more jobs than this use the LLM batch API when available
+BATCH_MIN_JOBS = 10
+BATCH_POLL_SECONDS = 30
+# Give up on a batch after this long and answer the prompts one by one
+BATCH_TIMEOUT_SECONDS = 6 * 60 * 60
+
+# Farm location used when the caller doesn't provide one
+DEFAULT_LAT = 35.5
+DEFAULT_LON = -80.0
+
+
+# What to look for, per plant part. "insect/pest" is the label the app's
+# text detector produces for pests.
+_PEST_HINT = "Look for insects, webbing, eggs, or visible feeding damage."
+_PLANT_PART_HINTS = {
+    "leaf": "Look for yellowing, spots, necrosis, or unusual discoloration.",
+    "pest": _PEST_HINT,
+    "insect/pest": _PEST_HINT,
+    "soil": "Check for compaction, cracking, color, and moisture state.",
+    "fruit": "Look for rot, cracks, discoloration, or deformity.",
+}
+
+
+@lru_cache(maxsize=512)
+def _image_dimensions(image_path: str, mtime_ns: int, file_size: int) -> Tuple[int, int]:
+    """
+    Read (width, height) from the image header only, without decoding pixels.
+    Cached per file version: mtime_ns and file_size are part of the key so an
+    overwritten file is re-read.
+    
+    Args:
+        image_path: Path to the image file
+        mtime_ns: File modification time (cache key only)
+        file_size: File size in bytes (cache key only)
+        
+    Returns:
+        (width, height), or (-1, -1) if the format is not recognized
+    """
+    if _HAS_IMAGESIZE:
+        return imagesize.get(image_path)
+
+    from PIL import Image
+    with Image.open(image_path) as img:
+        return img.size
+
 
 def infer_image_hints(image_path: str, plant_part: str) -> str:
     """
@@ -35,27 +94,23 @@ def infer_image_hints(image_path: str, plant_part: str) -> str:
     """
     hints = []
     
-    if plant_part.lower() == "leaf":
-        hints.append("Look for yellowing, spots, necrosis, or unusual discoloration.")
-    elif plant_part.lower() == "pest":
-        hints.append("Look for insects, webbing, eggs, or visible feeding damage.")
-    elif plant_part.lower() == "soil":
-        hints.append("Check for compaction, cracking, color, and moisture state.")
-    elif plant_part.lower() == "fruit":
-        hints.append("Look for rot, cracks, discoloration, or deformity.")
+    part_hint = _PLANT_PART_HINTS.get(plant_part.lower())
+    if part_hint:
+        hints.append(part_hint)
     
     # Try to get image dimensions for context
     try:
-        from PIL import Image
-        if os.path.exists(image_path):
-            img = Image.open(image_path)
-            if img.size[0] > 0 and img.size[1] > 0:
-                hints.append(f"Image dimensions: {img.size[0]}×{img.size[1]}.")
-                logger.debug(f"Image info: {img.format} {img.size}")
+        st = os.stat(image_path)
+        width, height = _image_dimensions(image_path, st.st_mtime_ns, st.st_size)
+        if width > 0 and height > 0:
+            hints.append(f"Image dimensions: {width}×{height}.")
+            logger.debug("Image size: %s×%s", width, height)
+    except FileNotFoundError:
+        pass
     except ImportError:
-        logger.debug("PIL not available; skipping image dimension check")
+        logger.debug("imagesize/PIL not available; skipping image dimension check")
     except Exception as e:
-        logger.warning(f"Error reading image: {e}")
+        logger.warning("Error reading image: %s", e)
     
     return " ".join(hints) if hints else "Farmer uploaded a crop image."
 
@@ -74,17 +129,65 @@ def encode_image_to_base64(image_path: str) -> str:
         FileNotFoundError: If image file doesn't exist
         IOError: If file cannot be read
     """
-    if not os.path.exists(image_path):
-        raise FileNotFoundError(f"Image file not found: {image_path}")
-    
     try:
         with open(image_path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            # Encode straight from the page cache instead of copying the
+            # whole photo into a bytes object first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return base64.b64encode(mm).decode("ascii")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image file not found: {image_path}") from None
     except IOError as e:
-        logger.error(f"Cannot read image file {image_path}: {e}")
+        logger.error("Cannot read image file %s: %s", image_path, e)
         raise
 
 
+def iter_image_base64(image_path: str, chunk_size: int = BASE64_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Stream an image as base64 without holding the whole photo in memory.
+    Suitable as a streaming request body (e.g. httpx content=...).
+    
+    Args:
+        image_path: Path to image file
+        chunk_size: Raw bytes read per chunk (must be a multiple of 3)
+        
+    Yields:
+        ASCII base64 chunks with no newlines; joined, they equal
+        encode_image_to_base64(image_path)
+        
+    Raises:
+        ValueError: If chunk_size is not a positive multiple of 3
+        FileNotFoundError: If image file doesn't exist
+    """
+    if chunk_size <= 0 or chunk_size % 3:
+        raise ValueError("chunk_size must be a positive multiple of 3")
+
+    try:
+        f = open(image_path, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image file not found: {image_path}") from None
+
+    with f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            yield base64.b64encode(block)
+
+
+# Fixed instructions that end every prompt
+_PROMPT_TASKS = """Your tasks:
+1. Say the MOST LIKELY problem (disease, pest, nutrient deficiency, water stress, mechanical damage).
+2. Explain WHY this is likely, using weather if relevant (e.g. high humidity → fungal).
+3. Give 3–5 short, numbered actions the farmer can do right now with low cost.
+4. If you mention spraying, tell them to confirm locally and avoid spraying before rain.
+5. If you are not sure, say so and tell them to take a sample to a local agronomist.
+
+Keep it short, farmer-friendly, no jargon."""
+
+
 def build_agronomy_prompt(
     farmer_text: str,
     crop_type: str,
@@ -94,8 +197,7 @@ def build_agronomy_prompt(
     image_hint: str,
 ) -> str:
     """Build the LLM prompt with all context."""
-    return f"""
-Farmer location/region: {region_hint}
+    return f"""Farmer location/region: {region_hint}
 Weather right now: {weather_summary}
 
 Crop: {crop_type}
@@ -107,15 +209,49 @@ Farmer description of the problem:
 Image notes:
 {image_hint}
 
-Your tasks:
-1. Say the MOST LIKELY problem (disease, pest, nutrient deficiency, water stress, mechanical damage).
-2. Explain WHY this is likely, using weather if relevant (e.g. high humidity → fungal).
-3. Give 3–5 short, numbered actions the farmer can do right now with low cost.
-4. If you mention spraying, tell them to confirm locally and avoid spraying before rain.
-5. If you are not sure, say so and tell them to take a sample to a local agronomist.
+{_PROMPT_TASKS}"""
+
+
+def _prepare_prompt(
+    llm,
+    image_path: str,
+    farmer_text: str,
+    crop_type: str,
+    plant_part: str,
+    lat: float,
+    lon: float,
+) -> str:
+    """Gather weather and image context and build the LLM prompt."""
+    # Weather is a network call; on a cache miss run it while the image
+    # is read locally. A cache hit needs no worker thread.
+    weather_info = get_cached_snapshot(lat, lon)
+    weather_future = None
+    if weather_info is None:
+        weather_future = EXECUTOR.submit(fetch_weather_snapshot, lat=lat, lon=lon)
+
+    # image to b64 only for clients that can actually look at it; the hints
+    # then go to a worker so both local reads overlap with the weather call
+    img_b64 = None
+    if llm.supports_vision:
+        hint_future = EXECUTOR.submit(infer_image_hints, image_path, plant_part)
+        img_b64 = encode_image_to_base64(image_path)
+        image_hint = hint_future.result()
+    else:
+        # generate context-aware image hints
+        image_hint = infer_image_hints(image_path, plant_part)
+
+    if weather_future is not None:
+        weather_info = weather_future.result()
+    weather_summary = weather_info["summary_text"]
 
-Keep it short, farmer-friendly, no jargon.
-""".strip()
+    return build_agronomy_prompt(
+        farmer_text=farmer_text,
+        crop_type=crop_type,
+        plant_part=plant_part,
+        region_hint=REGION_HINT,
+        weather_summary=weather_summary,
+        image_hint=image_hint,
+    )
 
 
 def analyze_crop_issue(
@@ -123,46 +259,89 @@ def analyze_crop_issue(
     farmer_text: str,
     crop_type: str,
     plant_part: str,
-    lat: float = 35.5,
-    lon: float = -80.0,
+    lat: float = DEFAULT_LAT,
+    lon: float = DEFAULT_LON,
 ):
     """Analyze crop issue with comprehensive error handling."""
     try:
         llm = get_llm_client()
 
-        # image to b64 (for future vision models — Groq text endpoint won't read it)
-        img_b64 = encode_image_to_base64(image_path)
+        prompt = _prepare_prompt(llm, image_path, farmer_text, crop_type, plant_part, lat, lon)
 
-        # fetch weather
-        weather_info = fetch_weather_snapshot(lat=lat, lon=lon)
-        weather_summary = weather_info["summary_text"]
-
-        # generate context-aware image hints
-        image_hint = infer_image_hints(image_path, plant_part)
-
-        prompt = build_agronomy_prompt(
-            farmer_text=farmer_text,
-            crop_type=crop_type,
-            plant_part=plant_part,
-            region_hint=REGION_HINT,
-            weather_summary=weather_summary,
-            image_hint=image_hint,
-        )
-
-        logger.debug(f"Sending prompt to LLM ({len(prompt)} chars)")
+        logger.debug("Sending prompt to LLM (%d chars)", len(prompt))
         raw_answer = llm.analyze_crop_from_prompt(prompt)
         
         # Extract summary
         summary = extract_summary(raw_answer)
-        logger.info(f"Analysis complete. Summary: {summary}")
+        logger.info("Analysis complete. Summary: %s", summary)
         
         return raw_answer
 
     except Exception as e:
-        logger.error(f"Crop analysis failed: {e}", exc_info=True)
+        logger.error("Crop analysis failed: %s", e, exc_info=True)
         raise
 
 
+def analyze_crop_issue_bulk(
+    jobs: List[dict],
+    poll_interval: float = BATCH_POLL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+) -> List[Optional[str]]:
+    """
+    Analyze many submissions offline (e.g. a nightly run over all uploads).
+    Above BATCH_MIN_JOBS jobs, prompts go through the LLM's batch API when it
+    has one; this blocks until the batch finishes (or timeout passes and
+    the prompts are answered one by one), so never call it from the UI path.
+    
+    Args:
+        jobs: One dict of analyze_crop_issue() keyword arguments per submission
+        poll_interval: Seconds between batch status checks
+        timeout: Seconds to wait for the batch before falling back
+        
+    Returns:
+        Raw answer for each job, in order (None where the batch lost a prompt)
+    """
+    llm = get_llm_client()
+    prompts = [
+        _prepare_prompt(
+            llm,
+            job["image_path"],
+            job["farmer_text"],
+            job["crop_type"],
+            job["plant_part"],
+            job.get("lat", DEFAULT_LAT),
+            job.get("lon", DEFAULT_LON),
+        )
+        for job in jobs
+    ]
+
+    if len(prompts) <= BATCH_MIN_JOBS or not hasattr(llm, "submit_batch"):
+        return [llm.analyze_crop_from_prompt(prompt) for prompt in prompts]
+
+    batch_id = llm.submit_batch(prompts)
+    deadline = time.monotonic() + timeout
+    while True:
+        answers = llm.poll_batch(batch_id, len(prompts))
+        if answers is not None:
+            break
+        if time.monotonic() >= deadline:
+            logger.warning(
+                "Batch %s still running after %.0fs; answering %d prompts one by one",
+                batch_id, timeout, len(prompts),
+            )
+            return [llm.analyze_crop_from_prompt(prompt) for prompt in prompts]
+        time.sleep(poll_interval)
+
+    if len(answers) != len(jobs):
+        # Never let answers shift onto the wrong jobs
+        logger.warning("Batch %s returned %d answers for %d jobs", batch_id, len(answers), len(jobs))
+        answers = (list(answers) + [None] * len(jobs))[:len(jobs)]
+    return answers
+
+
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+
+
 def extract_summary(response: str, max_sentences: int = 2) -> str:
     """
     Extract a brief summary from LLM response for UI display.
@@ -178,17 +357,28 @@ def extract_summary(response: str, max_sentences: int = 2) -> str:
         return "No response available."
     
     try:
-        # Split on sentence boundaries
-        sentences = re.split(r'(?<=[.!?])\s+', response.strip())
-        
-        if not sentences:
-            return response[:100].strip()
+        # Walk sentence boundaries lazily; stop once we have enough
+        text = response.strip()
+        sentences = []
+        truncated = False
+        last = 0
+        for m in _SENTENCE_BREAK_RE.finditer(text):
+            if len(sentences) >= max_sentences:
+                truncated = True
+                break
+            sentences.append(text[last:m.start()])
+            last = m.end()
+        else:
+            if len(sentences) < max_sentences:
+                sentences.append(text[last:])
+            else:
+                truncated = True
         
-        summary = " ".join(sentences[:max_sentences])
-        if len(sentences) > max_sentences:
+        summary = " ".join(sentences)
+        if truncated:
             summary += "..."
         
         return summary
     except Exception as e:
-        logger.warning(f"Error extracting summary: {e}")
+        logger.warning("Error extracting summary: %s", e)
         return response[:100].strip()
@@ -0,0 +1,192 @@
+"""
+keyword_matcher.py
+Multi-pattern keyword matching shared by the detection and safety rules.
+
+All keywords are compiled once into an Aho-Corasick automaton (pyahocorasick),
+so a text is scanned in a single pass no matter how many keywords there are.
+If pyahocorasick is not installed, a single precompiled regex is used instead.
+Both backends report every keyword that occurs as a substring, exactly like
+`keyword in text`.
+
+For large offline batches (e.g. re-grading stored answers), find_many() scans
+with an Intel Hyperscan database when the optional `hyperscan` package is
+installed.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+try:
+    import ahocorasick
+    _HAS_AHOCORASICK = True
+except ImportError:
+    _HAS_AHOCORASICK = False
+
+try:
+    import hyperscan
+    _HAS_HYPERSCAN = True
+except ImportError:
+    _HAS_HYPERSCAN = False
+
+
+# Below this many texts, compiling a Hyperscan database costs more than it saves
+HYPERSCAN_MIN_BATCH = 64
+
+
+def _collect_match_id(match_id, start, end, flags, context):
+    """Hyperscan match callback: record which keyword matched."""
+    context.add(match_id)
+
+
+class KeywordMatcher:
+    """Finds which keywords (and keyword categories) occur in a text."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        """
+        Compile the keyword groups.
+
+        Args:
+            groups: Mapping of category name -> keywords for that category.
+                A keyword may appear in several categories.
+        """
+        self._order = tuple(groups)
+        # keyword -> categories it belongs to
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        for category, keywords in groups.items():
+            for kw in keywords:
+                kw = kw.lower()
+                cats = self._categories.get(kw, ())
+                if category not in cats:
+                    self._categories[kw] = cats + (category,)
+
+        # Texts shorter than this cannot contain any keyword
+        self.min_length = min(map(len, self._categories), default=0)
+
+        self._hyperscan_db = None
+        self._automaton = None
+        if _HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self._categories:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        else:
+            # Longest alternatives first: at each position the regex reports the
+            # longest keyword starting there; every shorter keyword starting at
+            # the same position is a prefix of it, so we add those back.
+            ordered = sorted(self._categories, key=len, reverse=True)
+            self._pattern = re.compile(
+                "(?=(" + "|".join(map(re.escape, ordered)) + "))"
+            )
+            self._prefixes = {
+                kw: tuple(k for k in self._categories if kw.startswith(k))
+                for kw in self._categories
+            }
+
+    def find(self, lowered: str) -> Set[str]:
+        """
+        Return the distinct keywords found in the text.
+
+        Args:
+            lowered: Text to scan, already lowercased
+
+        Returns:
+            Set of matched keywords
+        """
+        if len(lowered) < self.min_length:
+            return set()
+
+        if self._automaton is not None:
+            return {kw for _, kw in self._automaton.iter(lowered)}
+
+        found = set()
+        for m in self._pattern.finditer(lowered):
+            found.update(self._prefixes[m.group(1)])
+        return found
+
+    def find_many(self, lowered_texts: Iterable[str]) -> List[Set[str]]:
+        """
+        Return the distinct keywords found in each of many texts.
+        Uses Hyperscan when installed; the database is compiled on the first
+        batch of at least HYPERSCAN_MIN_BATCH texts, so the per-request path
+        and small batches never pay for it.
+
+        Args:
+            lowered_texts: Texts to scan, already lowercased
+
+        Returns:
+            One set of matched keywords per text, in input order
+        """
+        lowered_texts = list(lowered_texts)
+        if not _HAS_HYPERSCAN or (
+            self._hyperscan_db is None and len(lowered_texts) < HYPERSCAN_MIN_BATCH
+        ):
+            return [self.find(text) for text in lowered_texts]
+
+        if self._hyperscan_db is None:
+            self._keyword_list = list(self._categories)
+            expressions = [re.escape(kw.encode("utf-8")) for kw in self._keyword_list]
+            database = hyperscan.Database()
+            database.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                # Report each keyword at most once per text
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+            )
+            self._hyperscan_db = database
+
+        results = []
+        for text in lowered_texts:
+            ids: Set[int] = set()
+            self._hyperscan_db.scan(
+                text.encode("utf-8"),
+                match_event_handler=_collect_match_id,
+                context=ids,
+            )
+            results.append({self._keyword_list[i] for i in ids})
+        return results
+
+    def categories(self, lowered: str) -> Set[str]:
+        """
+        Return the categories with at least one keyword in the text.
+
+        Args:
+            lowered: Text to scan, already lowercased
+
+        Returns:
+            Set of matched category names
+        """
+        return {cat for kw in self.find(lowered) for cat in self._categories[kw]}
+
+    def categories_many(self, lowered_texts: Iterable[str]) -> List[Set[str]]:
+        """
+        Return the matched categories for each of many texts (see find_many).
+
+        Args:
+            lowered_texts: Texts to scan, already lowercased
+
+        Returns:
+            One set of matched category names per text, in input order
+        """
+        return [
+            {cat for kw in found for cat in self._categories[kw]}
+            for found in self.find_many(lowered_texts)
+        ]
+
+    def scores(self, lowered: str) -> Counter:
+        """
+        Count the distinct keywords matched for each category.
+
+        Args:
+            lowered: Text to scan, already lowercased
+
+        Returns:
+            Counter of category -> number of matched keywords, holding only
+            categories with a match, in the order the groups were defined
+            (so most_common() breaks ties in favour of the first group)
+        """
+        counts = Counter(
+            cat for kw in self.find(lowered) for cat in self._categories[kw]
+        )
+        return Counter({cat: counts[cat] for cat in self._order if cat in counts})
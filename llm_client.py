@@ -4,44 +4,221 @@ LLM client with support for Groq API and offline mock.
 Provides intelligent fallback and configurable prompting.
 """
 
+import asyncio
+import json
 import os
 import re
-import random
-from typing import Optional
-from dotenv import load_dotenv
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
+try:
+    import httpx
+    _HAS_HTTPX = True
+except ImportError:
+    _HAS_HTTPX = False
+
+from config import load_env
+from keyword_matcher import KeywordMatcher
 from logging_config import get_logger
+from response_cache import get_llm_cache, make_key
+from utils_http import get_session
 
 logger = get_logger("llm_client")
 
-load_dotenv()
+load_env()
 
 # Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_FILES_URL = "https://api.groq.com/openai/v1/files"
+GROQ_BATCHES_URL = "https://api.groq.com/openai/v1/batches"
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
 GROQ_TIMEOUT = int(os.getenv("GROQ_TIMEOUT", "30"))
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+# Batch limits for the async client (Groq rate limits are per minute)
+GROQ_MAX_INFLIGHT = int(os.getenv("GROQ_MAX_INFLIGHT", "8"))
+GROQ_QPM = int(os.getenv("GROQ_QPM", "500"))
+
+SYSTEM_PROMPT = (
+    "You are a senior field agronomist. "
+    "You ALWAYS return short, actionable steps for farmers."
+)
+
+
+# Longest Retry-After we are willing to honor before giving up on the attempt
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+class GroqAPIError(RuntimeError):
+    """Non-200 response from the Groq API."""
+
+    def __init__(self, status_code: int, text: str, retry_after: Optional[float] = None):
+        super().__init__(f"Groq API error: {status_code} - {text}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits and server errors may succeed later; other 4xx won't."""
+        return self.status_code == 429 or self.status_code >= 500
+
+
+def _groq_status_error(status_code: int, text: str, headers) -> GroqAPIError:
+    """
+    Build the error for a non-200 response and log it.
+    
+    Args:
+        status_code: HTTP status code
+        text: Response body
+        headers: Response headers (for Retry-After)
+        
+    Returns:
+        GroqAPIError to raise
+    """
+    retry_after = None
+    if status_code == 429:
+        try:
+            retry_after = float(headers.get("Retry-After", ""))
+        except ValueError:
+            pass  # missing, or an HTTP date: fall back to exponential backoff
+    error = GroqAPIError(status_code, text, retry_after)
+    logger.error(str(error))
+    return error
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transient network failures, 429s and 5xx; fail fast on the rest."""
+    if isinstance(exc, GroqAPIError):
+        return exc.retryable
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return _HAS_HTTPX and isinstance(exc, httpx.TransportError)
+
+
+_backoff = wait_exponential(multiplier=1, min=2, max=10)
+
+
+def _retry_wait(retry_state) -> float:
+    """Honor the server's Retry-After on 429, otherwise back off exponentially."""
+    exc = retry_state.outcome.exception()
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), MAX_RETRY_AFTER_SECONDS)
+    return _backoff(retry_state)
+
+
+# Shared by the sync and async clients (tenacity handles coroutines too)
+_groq_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(3),
+    wait=_retry_wait,
+)
+
+
+def _groq_request(api_key: str, prompt: str) -> tuple:
+    """
+    Build the headers and JSON body for a Groq chat completion.
+    
+    Args:
+        api_key: Groq API key
+        prompt: Agronomy analysis prompt
+        
+    Returns:
+        (headers, body) tuple
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+    body = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT,
+            },
+            {
+                "role": "user",
+                "content": prompt,
+            },
+        ],
+        "temperature": 0.4,
+    }
+    return headers, body
+
+
+def _groq_content(data: dict) -> str:
+    """
+    Pull the answer text out of a Groq response body.
+    
+    Args:
+        data: Decoded JSON response
+        
+    Returns:
+        LLM response text
+        
+    Raises:
+        RuntimeError: If the response has an unexpected shape
+    """
+    try:
+        return data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError) as e:
+        logger.error("Unexpected Groq response format: %s", data)
+        raise RuntimeError("Invalid response format from Groq API") from e
+
+
+def _cached_response(key: str, bypass_cache: bool) -> Optional[str]:
+    """
+    Look up a stored response.
+    
+    Args:
+        key: Cache key for the request
+        bypass_cache: If True, always miss (the fresh answer is still stored)
+        
+    Returns:
+        Cached response text, or None
+    """
+    cache = get_llm_cache()
+    if bypass_cache or cache is None:
+        return None
+    result = cache.get(key)
+    if result is not None:
+        logger.debug("LLM response served from cache")
+    return result
+
+
+def _store_response(key: str, result: str) -> None:
+    """Store a response in the LLM cache, if it is enabled."""
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.set(key, result)
 
 
 class GroqLLMClient:
     """LLM client for Groq API with retry logic and error handling."""
 
+    # Text-only chat endpoint: images are not sent
+    supports_vision = False
+
     def __init__(self, api_key: str):
         """Initialize with API key."""
         if not api_key:
             raise ValueError("GROQ_API_KEY cannot be empty")
         self.api_key = api_key
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def analyze_crop_from_prompt(self, prompt: str) -> str:
+    def analyze_crop_from_prompt(self, prompt: str, bypass_cache: bool = False) -> str:
         """
-        Analyze crop issue using Groq API with automatic retry.
+        Analyze crop issue using Groq API, reusing a cached answer for an
+        identical prompt.
         
         Args:
             prompt: Agronomy analysis prompt
+            bypass_cache: Always call the API (the answer is still cached)
             
         Returns:
             LLM response text
@@ -49,145 +226,438 @@ class GroqLLMClient:
         if not prompt or len(prompt.strip()) == 0:
             raise ValueError("Prompt cannot be empty")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        body = {
-            "model": GROQ_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a senior field agronomist. "
-                        "You ALWAYS return short, actionable steps for farmers."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            "temperature": 0.4,
-        }
+        key = make_key(GROQ_MODEL, SYSTEM_PROMPT, prompt)
+        result = _cached_response(key, bypass_cache)
+        if result is None:
+            result = self._request(prompt)
+            _store_response(key, result)
+        return result
+
+    def analyze_crop_from_prompt_batch(
+        self, prompts: List[str], max_inflight: int = GROQ_MAX_INFLIGHT
+    ) -> List[str]:
+        """
+        Analyze several prompts concurrently, so N calls take roughly the
+        time of the slowest one instead of their sum.
+        
+        Args:
+            prompts: Agronomy analysis prompts
+            max_inflight: Maximum concurrent API calls
+            
+        Returns:
+            LLM response text for each prompt, in input order
+        """
+        if len(prompts) <= 1:
+            return [self.analyze_crop_from_prompt(p) for p in prompts]
+        # A private pool: callers may already be running on the shared EXECUTOR
+        with ThreadPoolExecutor(max_workers=min(max(1, max_inflight), len(prompts))) as pool:
+            return list(pool.map(self.analyze_crop_from_prompt, prompts))
+
+    @_groq_retry
+    def _request(self, prompt: str) -> str:
+        """
+        Call the Groq API, retrying network errors, 429s and 5xx.
+        
+        Args:
+            prompt: Agronomy analysis prompt
+            
+        Returns:
+            LLM response text
+        """
+        headers, body = _groq_request(self.api_key, prompt)
 
         try:
-            logger.debug(f"Calling Groq API (model: {GROQ_MODEL})")
-            resp = requests.post(GROQ_URL, headers=headers, json=body, timeout=GROQ_TIMEOUT)
+            logger.debug("Calling Groq API (model: %s)", GROQ_MODEL)
+            resp = get_session().post(GROQ_URL, headers=headers, json=body, timeout=GROQ_TIMEOUT)
 
             if resp.status_code != 200:
-                error_msg = f"Groq API error: {resp.status_code} - {resp.text}"
-                logger.error(error_msg)
-                raise RuntimeError(error_msg)
+                raise _groq_status_error(resp.status_code, resp.text, resp.headers)
 
-            data = resp.json()
-            result = data["choices"][0]["message"]["content"]
+            result = _groq_content(resp.json())
             logger.info("Groq API response received successfully")
             return result
 
-        except (KeyError, IndexError) as e:
-            logger.error(f"Unexpected Groq response format: {data}")
-            raise RuntimeError("Invalid response format from Groq API") from e
         except requests.RequestException as e:
-            logger.error(f"Network error calling Groq API: {e}")
+            logger.error("Network error calling Groq API: %s", e)
             raise
 
+    def _check(self, resp) -> "requests.Response":
+        """Raise GroqAPIError for a non-2xx response, else return it."""
+        if not 200 <= resp.status_code < 300:
+            raise _groq_status_error(resp.status_code, resp.text, resp.headers)
+        return resp
 
-class MockLLMClient:
-    """Mock LLM client for offline operation with heuristic responses."""
+    def submit_batch(self, prompts: List[str]) -> str:
+        """
+        Submit prompts to the Groq batch API for offline processing.
+        Batch jobs are cheaper than per-request calls and bypass the
+        per-minute rate limit, but finish asynchronously (up to 24h).
+        
+        Args:
+            prompts: Agronomy analysis prompts
+            
+        Returns:
+            Batch ID to pass to poll_batch()
+        """
+        if not prompts:
+            raise ValueError("Batch needs at least one prompt")
+
+        lines = []
+        for i, prompt in enumerate(prompts):
+            _, body = _groq_request(self.api_key, prompt)
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+        batch_file = ("\n".join(lines) + "\n").encode("utf-8")
+
+        auth = {"Authorization": f"Bearer {self.api_key}"}
+        session = get_session()
+        uploaded = self._check(session.post(
+            GROQ_FILES_URL,
+            headers=auth,
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", batch_file, "application/jsonl")},
+            timeout=GROQ_TIMEOUT,
+        )).json()
+
+        batch = self._check(session.post(
+            GROQ_BATCHES_URL,
+            headers=auth,
+            json={
+                "input_file_id": uploaded["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+            timeout=GROQ_TIMEOUT,
+        )).json()
+        logger.info("Submitted Groq batch %s (%d prompts)", batch["id"], len(prompts))
+        return batch["id"]
+
+    def poll_batch(self, batch_id: str, num_prompts: int) -> Optional[List[Optional[str]]]:
+        """
+        Check a batch and collect its answers once it has finished.
+        
+        Args:
+            batch_id: ID returned by submit_batch()
+            num_prompts: Number of prompts passed to submit_batch()
+            
+        Returns:
+            None while the batch is still running; otherwise one answer per
+            submitted prompt, in submission order (None for failed prompts)
+            
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        auth = {"Authorization": f"Bearer {self.api_key}"}
+        session = get_session()
+        batch = self._check(session.get(
+            f"{GROQ_BATCHES_URL}/{batch_id}", headers=auth, timeout=GROQ_TIMEOUT
+        )).json()
+
+        status = batch.get("status")
+        if status in ("failed", "expired", "cancelled", "cancelling"):
+            raise RuntimeError(f"Groq batch {batch_id} {status}")
+        if status != "completed":
+            logger.debug("Groq batch %s status: %s", batch_id, status)
+            return None
+
+        answers: List[Optional[str]] = [None] * num_prompts
+        if batch.get("output_file_id"):
+            output = self._check(session.get(
+                f"{GROQ_FILES_URL}/{batch['output_file_id']}/content",
+                headers=auth,
+                timeout=GROQ_TIMEOUT,
+            )).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                index = int(row["custom_id"])
+                if not 0 <= index < num_prompts:
+                    logger.warning("Groq batch %s: unexpected custom_id %s", batch_id, row["custom_id"])
+                    continue
+                response = row.get("response") or {}
+                if response.get("status_code") == 200:
+                    answers[index] = _groq_content(response["body"])
+
+        failed = sum(answer is None for answer in answers)
+        if failed:
+            logger.warning("Groq batch %s: %d of %d prompts failed", batch_id, failed, len(answers))
+        return answers
+
+
+async def _gather_rate_limited(analyze, prompts: List[str], max_inflight: int, qpm: int) -> List[str]:
+    """
+    Run analyze(prompt) for every prompt concurrently, with at most
+    max_inflight requests open and no more than qpm requests started per minute.
+    
+    Args:
+        analyze: Coroutine function taking a prompt
+        prompts: Prompts to analyze
+        max_inflight: Maximum concurrent requests
+        qpm: Maximum requests started per minute (0 disables the limit)
+        
+    Returns:
+        Responses in the same order as prompts
+    """
+    semaphore = asyncio.Semaphore(max(1, max_inflight))
+    interval = 60.0 / qpm if qpm > 0 else 0.0
+    slot_lock = asyncio.Lock()
+    next_slot = time.monotonic()
+
+    async def _one(prompt: str) -> str:
+        nonlocal next_slot
+        async with semaphore:
+            if interval:
+                # Hand out evenly spaced start times
+                async with slot_lock:
+                    delay = next_slot - time.monotonic()
+                    next_slot = max(next_slot, time.monotonic()) + interval
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            return await analyze(prompt)
+
+    return await asyncio.gather(*[_one(p) for p in prompts])
+
+
+class AsyncGroqLLMClient:
+    """Async Groq client: one pooled connection set, many prompts in flight."""
+
+    supports_vision = False
+
+    def __init__(self, api_key: str, client: Optional["httpx.AsyncClient"] = None):
+        """
+        Initialize with API key.
+        
+        Args:
+            api_key: Groq API key
+            client: Optional preconfigured httpx.AsyncClient (e.g. for tests)
+        """
+        if not api_key:
+            raise ValueError("GROQ_API_KEY cannot be empty")
+        if client is None and not _HAS_HTTPX:
+            raise ImportError("httpx required for AsyncGroqLLMClient")
+        self.api_key = api_key
+        # Created once so TCP/TLS connections are reused across calls
+        self._client = client or httpx.AsyncClient(
+            timeout=GROQ_TIMEOUT,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
 
-    def analyze_crop_from_prompt(self, prompt: str) -> str:
+    async def analyze_crop_from_prompt(self, prompt: str, bypass_cache: bool = False) -> str:
         """
-        Analyze crop issue using keyword heuristics (offline, no API needed).
+        Analyze crop issue using Groq API, reusing a cached answer for an
+        identical prompt.
         
         Args:
             prompt: Agronomy analysis prompt
+            bypass_cache: Always call the API (the answer is still cached)
             
         Returns:
-            Heuristic diagnosis text
+            LLM response text
         """
         if not prompt or len(prompt.strip()) == 0:
             raise ValueError("Prompt cannot be empty")
 
-        text = prompt.lower()
+        key = make_key(GROQ_MODEL, SYSTEM_PROMPT, prompt)
+        result = _cached_response(key, bypass_cache)
+        if result is None:
+            result = await self._request(prompt)
+            _store_response(key, result)
+        return result
 
-        # Extract the farmer's description
-        farmer_text = ""
-        m = re.search(r'farmer description of the problem:\s*"""(.*?)"""', prompt, flags=re.I | re.S)
-        if m:
-            farmer_text = m.group(1).strip().lower()
+    @_groq_retry
+    async def _request(self, prompt: str) -> str:
+        """
+        Call the Groq API, retrying network errors, 429s and 5xx.
+        
+        Args:
+            prompt: Agronomy analysis prompt
+            
+        Returns:
+            LLM response text
+        """
+        headers, body = _groq_request(self.api_key, prompt)
+
+        try:
+            logger.debug("Calling Groq API async (model: %s)", GROQ_MODEL)
+            resp = await self._client.post(GROQ_URL, headers=headers, json=body)
+
+            if resp.status_code != 200:
+                raise _groq_status_error(resp.status_code, resp.text, resp.headers)
+
+            return _groq_content(resp.json())
+
+        except httpx.HTTPError as e:
+            logger.error("Network error calling Groq API: %s", e)
+            raise
+
+    async def analyze_crop_from_prompt_batch(
+        self,
+        prompts: List[str],
+        max_inflight: int = GROQ_MAX_INFLIGHT,
+        qpm: int = GROQ_QPM,
+    ) -> List[str]:
+        """
+        Analyze many prompts concurrently within Groq rate limits.
+        
+        Args:
+            prompts: Agronomy analysis prompts
+            max_inflight: Maximum concurrent requests
+            qpm: Maximum requests started per minute
+            
+        Returns:
+            LLM response texts, in the same order as prompts
+        """
+        return await _gather_rate_limited(
+            self.analyze_crop_from_prompt, prompts, max_inflight, qpm
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self._client.aclose()
 
-        if DEBUG:
-            logger.debug(f"MockLLM extracted farmer text: '{farmer_text[:80]}'")
 
-        # PRIORITY 1: Water stress
-        water_keywords = ["dry", "wilting", "wilt", "drought", "cracked", "moisture", "parched"]
-        if any(k in farmer_text for k in water_keywords):
-            if DEBUG:
-                logger.debug("MockLLM: Detected WATER STRESS")
-            return f"""Looks like water stress.
+# Mock heuristics, compiled once: all four symptom vocabularies are matched in
+# one pass over the farmer's text (substring semantics, like `keyword in text`)
+_FARMER_TEXT_RE = re.compile(r'farmer description of the problem:\s*"""(.*?)"""', re.I | re.S)
+
+_SYMPTOM_MATCHER = KeywordMatcher({
+    "water": ["dry", "wilting", "wilt", "drought", "cracked", "moisture", "parched"],
+    "disease": ["spot", "lesion", "blight", "mottle", "necrosis", "discolor", "disease"],
+    "pest": ["insect", "caterpillar", "hole", "worm", "borer", "pest", "bug", "larvae", "egg"],
+    "nutrient": ["yellow", "chlorosis", "pale", "nitrogen", "nutrient", "deficiency"],
+})
+
+# (symptom, log label, answer text before the farmer quote), highest priority first
+_SYMPTOM_ANSWERS = (
+    ("water", "WATER STRESS", """Looks like water stress.
 1) Water deeply at the base in the early morning.
 2) Mulch to preserve soil moisture.
 3) Avoid frequent shallow watering.
 
-Based on farmer observation: '{farmer_text[:100]}'"""
-
-        # PRIORITY 2: Disease/spots
-        disease_keywords = ["spot", "lesion", "blight", "mottle", "necrosis", "discolor", "disease"]
-        if any(k in farmer_text for k in disease_keywords):
-            if DEBUG:
-                logger.debug("MockLLM: Detected DISEASE/SPOTS")
-            return f"""Likely a leaf disease (possible fungal or bacterial).
+"""),
+    ("disease", "DISEASE/SPOTS", """Likely a leaf disease (possible fungal or bacterial).
 1) Remove and safely dispose of the most affected leaves.
 2) Improve airflow and avoid overhead watering.
 3) If it worsens, photograph and consult a local agronomist before spraying.
 
-Based on farmer observation: '{farmer_text[:100]}'"""
-
-        # PRIORITY 3: Pests/insects
-        pest_keywords = ["insect", "caterpillar", "hole", "worm", "borer", "pest", "bug", "larvae", "egg"]
-        if any(k in farmer_text for k in pest_keywords):
-            if DEBUG:
-                logger.debug("MockLLM: Detected PEST/INSECT")
-            return f"""Likely insect feeding damage.
+"""),
+    ("pest", "PEST/INSECT", """Likely insect feeding damage.
 1) Inspect undersides of leaves for eggs or caterpillars.
 2) Handpick visible pests and remove them.
 3) Use a spot spray of a low-toxicity insecticide only if damage is heavy.
 
-Based on farmer observation: '{farmer_text[:100]}'"""
-
-        # PRIORITY 4: Nutrient deficiency
-        nutrient_keywords = ["yellow", "chlorosis", "pale", "nitrogen", "nutrient", "deficiency"]
-        if any(k in farmer_text for k in nutrient_keywords):
-            if DEBUG:
-                logger.debug("MockLLM: Detected NUTRIENT DEFICIENCY")
-            return f"""Likely nutrient deficiency (nitrogen or iron).
+"""),
+    ("nutrient", "NUTRIENT DEFICIENCY", """Likely nutrient deficiency (nitrogen or iron).
 1) Apply a low-dose nitrogen fertilizer now.
 2) Monitor new leaf color over 7–10 days.
 3) Mulch and keep even soil moisture.
 
-Based on farmer observation: '{farmer_text[:100]}'"""
+"""),
+)
 
-        # FALLBACK: Generic templates
-        if DEBUG:
-            logger.debug("MockLLM: Using FALLBACK template")
-        templates = [
-            f"""This could be multiple issues. Here are immediate steps:
+# Generic answers when no symptom matched
+_FALLBACK_ANSWERS = (
+    """This could be multiple issues. Here are immediate steps:
 1) Remove the most damaged leaves carefully.
 2) Inspect for pests and disease spots.
 3) Check soil moisture and improve airflow.
 
-Based on: '{farmer_text[:100]}'""",
-            f"""I need more information, but try these steps:
+""",
+    """I need more information, but try these steps:
 1) Take a clear close-up photo of the affected area.
 2) Remove heavily damaged tissue to prevent spread.
 3) Show samples to a local agronomist if symptoms worsen.
 
-Based on: '{farmer_text[:100]}'""",
-        ]
+""",
+)
+
+
+class MockLLMClient:
+    """Mock LLM client for offline operation with heuristic responses."""
+
+    supports_vision = False
+
+    def analyze_crop_from_prompt(self, prompt: str, bypass_cache: bool = False) -> str:
+        """
+        Analyze crop issue using keyword heuristics (offline, no API needed).
+        Answers are deterministic per prompt. They are cheap to compute and
+        never go through the response cache, so edits to the heuristics
+        show up immediately.
+        
+        Args:
+            prompt: Agronomy analysis prompt
+            bypass_cache: Accepted for interface parity with GroqLLMClient;
+                ignored
+            
+        Returns:
+            Heuristic diagnosis text
+        """
+        if not prompt or len(prompt.strip()) == 0:
+            raise ValueError("Prompt cannot be empty")
+
+        return self._heuristic_answer(prompt)
 
-        return random.choice(templates)
+    def analyze_crop_from_prompt_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """Heuristic diagnosis for each prompt, in order."""
+        return [self.analyze_crop_from_prompt(p) for p in prompts]
+
+    def _heuristic_answer(self, prompt: str) -> str:
+        """
+        Pick a diagnosis template from keywords in the farmer's description.
+        
+        Args:
+            prompt: Agronomy analysis prompt
+            
+        Returns:
+            Heuristic diagnosis text
+        """
+        # Extract the farmer's description
+        farmer_text = ""
+        m = _FARMER_TEXT_RE.search(prompt)
+        if m:
+            farmer_text = m.group(1).strip().lower()
+
+        logger.debug("MockLLM extracted farmer text: '%s'", farmer_text[:80])
+
+        symptoms = _SYMPTOM_MATCHER.categories(farmer_text)
+        snippet = farmer_text[:100]
+
+        # Symptom answers, in priority order
+        for symptom, label, answer_head in _SYMPTOM_ANSWERS:
+            if symptom in symptoms:
+                logger.debug("MockLLM: Detected %s", label)
+                return answer_head + "Based on farmer observation: '" + snippet + "'"
+
+        # FALLBACK: Generic templates
+        logger.debug("MockLLM: Using FALLBACK template")
+        # Pick by a hash of the description so the same question gets the same answer
+        index = zlib.crc32(farmer_text.encode("utf-8")) % len(_FALLBACK_ANSWERS)
+        return _FALLBACK_ANSWERS[index] + "Based on: '" + snippet + "'"
+
+
+class AsyncMockLLMClient:
+    """Async facade over MockLLMClient so offline callers can use the batch API."""
+
+    supports_vision = False
+
+    def __init__(self):
+        self._mock = MockLLMClient()
+
+    async def analyze_crop_from_prompt(self, prompt: str, bypass_cache: bool = False) -> str:
+        """Heuristic diagnosis (see MockLLMClient.analyze_crop_from_prompt)."""
+        return self._mock.analyze_crop_from_prompt(prompt, bypass_cache)
+
+    async def analyze_crop_from_prompt_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """Heuristic diagnosis for each prompt, in order."""
+        return [self._mock.analyze_crop_from_prompt(p) for p in prompts]
+
+    async def aclose(self) -> None:
+        """Nothing to release."""
 
 
 def get_llm_client():
@@ -197,3 +667,15 @@ def get_llm_client():
         return GroqLLMClient(GROQ_API_KEY)
     logger.warning("No GROQ_API_KEY found; using offline MockLLMClient")
     return MockLLMClient()
+
+
+def get_async_llm_client():
+    """Get configured async LLM client (Groq via httpx, or Mock)."""
+    if GROQ_API_KEY and _HAS_HTTPX:
+        logger.info("Using async Groq LLM client")
+        return AsyncGroqLLMClient(GROQ_API_KEY)
+    if GROQ_API_KEY:
+        logger.warning("httpx not installed; using offline AsyncMockLLMClient")
+    else:
+        logger.warning("No GROQ_API_KEY found; using offline AsyncMockLLMClient")
+    return AsyncMockLLMClient()
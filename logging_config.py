@@ -1,11 +1,18 @@
 """
 logging_config.py
 Centralized logging configuration for the app.
+
+Handlers are attached once, even if this module is imported again (tests,
+reloads, worker processes). Records are handed to a queue and written to the
+console and log file by a background listener thread, so request threads
+never block on disk I/O.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Read DEBUG level from environment
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -13,32 +20,53 @@ LOG_LEVEL = logging.DEBUG if DEBUG else logging.INFO
 
 # Create logger
 logger = logging.getLogger("agri_assistant")
-logger.setLevel(LOG_LEVEL)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(LOG_LEVEL)
-
-# File handler (rotate every 5MB, keep 3 backups)
-os.makedirs("logs", exist_ok=True)
-file_handler = RotatingFileHandler(
-    "logs/agri_assistant.log",
-    maxBytes=5 * 1024 * 1024,  # 5MB
-    backupCount=3
-)
-file_handler.setLevel(LOG_LEVEL)
-
-# Formatter
-formatter = logging.Formatter(
-    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-console_handler.setFormatter(formatter)
-file_handler.setFormatter(formatter)
-
-# Add handlers
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+
+
+def _configure() -> None:
+    """Attach the queue handler and start its listener (idempotent)."""
+    logger.setLevel(LOG_LEVEL)
+    # The logger object outlives a module reload, so mark it rather than
+    # relying on a module-level flag
+    if getattr(logger, "_agri_configured", False):
+        return
+
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(LOG_LEVEL)
+
+    # File handler (rotate every 5MB, keep 3 backups)
+    os.makedirs("logs", exist_ok=True)
+    file_handler = RotatingFileHandler(
+        "logs/agri_assistant.log",
+        maxBytes=5 * 1024 * 1024,  # 5MB
+        backupCount=3
+    )
+    file_handler.setLevel(LOG_LEVEL)
+
+    # Formatter
+    formatter = logging.Formatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    console_handler.setFormatter(formatter)
+    file_handler.setFormatter(formatter)
+
+    # Callers only enqueue; the listener thread formats and writes
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
+    # Our handlers already cover everything; don't emit again via root
+    logger.propagate = False
+    logger._agri_configured = True
+
+
+_configure()
+
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger for a specific module."""
@@ -0,0 +1,179 @@
+"""
+response_cache.py
+Small on-disk cache for slow network responses (LLM answers, weather).
+
+Entries live in a SQLite file so they survive restarts and can be shared by
+several processes. Values are stored as JSON and expire after a TTL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from config import load_env
+from logging_config import get_logger
+
+logger = get_logger("response_cache")
+
+load_env()
+
+# Configuration
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".llm_cache", "responses.sqlite3"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+WEATHER_CACHE_PATH = os.getenv(
+    "WEATHER_CACHE_PATH", os.path.join(".weather_cache", "weather.sqlite3")
+)
+WEATHER_CACHE_ENABLED = os.getenv("WEATHER_CACHE_ENABLED", "True").lower() == "true"
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "10000"))
+
+
+def make_key(*parts: str) -> str:
+    """
+    Build a stable cache key from the inputs that determine a response.
+
+    Args:
+        parts: e.g. model name, system prompt, user prompt
+
+    Returns:
+        Hex digest identifying the inputs
+    """
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Key/value cache with per-entry expiry, backed by SQLite.
+    Expired rows are purged on open and on every write, and the oldest rows
+    are evicted once the table holds more than max_entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: SQLite file path; parent directories are created
+            ttl_seconds: Default lifetime of an entry
+            max_entries: Most rows kept; older rows are evicted first
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+            )
+            self._prune()
+
+    def _prune(self) -> None:
+        """Delete expired rows and cap the table size. Call with _lock held."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        # INSERT OR REPLACE gives a row a fresh rowid, so rowid order is
+        # write order: keep only the newest max_entries rowids
+        self._conn.execute(
+            "DELETE FROM responses WHERE rowid <= (SELECT MAX(rowid) FROM responses) - ?",
+            (self.max_entries,),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value, or None if missing or expired.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        """
+        Store a JSON-serialisable value.
+
+        Args:
+            key: Cache key (see make_key)
+            value: Value to store
+            ttl_seconds: Lifetime of this entry (defaults to the cache TTL)
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+            self._prune()
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _shared_cache(path: str, label: str, max_entries: int) -> Optional[ResponseCache]:
+    """Open the cache at path once per process; None if it can't be opened."""
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                try:
+                    cache = _caches[path] = ResponseCache(path, max_entries=max_entries)
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning("%s cache unavailable: %s", label, e)
+                    return None
+    return cache
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    """
+    Get the shared LLM response cache, opening it on first use.
+
+    Returns:
+        ResponseCache, or None if disabled or the file cannot be opened
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    return _shared_cache(LLM_CACHE_PATH, "LLM response", LLM_CACHE_MAX_ENTRIES)
+
+
+def get_weather_cache() -> Optional[ResponseCache]:
+    """
+    Get the shared on-disk weather cache (second tier behind the in-memory
+    one in weather_client), opening it on first use.
+
+    Returns:
+        ResponseCache, or None if disabled or the file cannot be opened
+    """
+    if not WEATHER_CACHE_ENABLED:
+        return None
+    return _shared_cache(WEATHER_CACHE_PATH, "Weather", WEATHER_CACHE_MAX_ENTRIES)
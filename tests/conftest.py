@@ -0,0 +1,62 @@
+"""
+tests/conftest.py
+Shared fixtures: keep the suite offline and deterministic.
+
+API keys from the environment / .env are blanked so every client takes its
+offline path, and real HTTP is refused at the transport layer. Tests that
+exercise an API client inject a fake session or transport themselves.
+The LLM response cache lives in a fresh per-test directory and the weather
+disk tier is off, so no result depends on an earlier run or a developer's
+own cache.
+"""
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    _HAS_HTTPX = True
+except ImportError:
+    _HAS_HTTPX = False
+
+import llm_client
+import response_cache
+import voice_of_the_agronomist
+import weather_client
+
+
+def _refuse_requests(self, request, *args, **kwargs):
+    raise requests.ConnectionError(f"Network disabled in tests: {request.url}")
+
+
+def _refuse_httpx(self, request):
+    raise httpx.ConnectError(f"Network disabled in tests: {request.url}", request=request)
+
+
+async def _refuse_httpx_async(self, request):
+    _refuse_httpx(self, request)
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmp_path):
+    """Run every test without API keys, network access or shared disk caches."""
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.setattr(llm_client, "GROQ_API_KEY", "")
+    monkeypatch.setattr(weather_client, "WEATHER_API_KEY", "")
+    monkeypatch.setattr(voice_of_the_agronomist, "ELEVENLABS_API_KEY", "")
+    monkeypatch.setattr(voice_of_the_agronomist, "ELEVENLABS_VOICE_ID", "")
+    # TTS tiers are picked at import; pick again now that the keys are blank
+    monkeypatch.setattr(
+        voice_of_the_agronomist, "_TTS_TIERS", voice_of_the_agronomist._select_tiers()
+    )
+
+    monkeypatch.setattr(response_cache, "LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(response_cache, "WEATHER_CACHE_PATH", str(tmp_path / "weather.sqlite3"))
+    monkeypatch.setattr(response_cache, "_caches", {})
+    monkeypatch.setattr(weather_client, "get_weather_cache", lambda: None)
+
+    monkeypatch.setattr(HTTPAdapter, "send", _refuse_requests)
+    if _HAS_HTTPX:
+        monkeypatch.setattr(httpx.HTTPTransport, "handle_request", _refuse_httpx)
+        monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", _refuse_httpx_async)
@@ -9,6 +9,7 @@ from advisory_rules import (
     _sounds_uncertain,
     _assess_escalation_level,
     apply_safety_and_escalation,
+    assess_escalation_levels,
     EscalationLevel,
 )
 
@@ -54,6 +55,17 @@ class TestAdvisoryRules:
         level = _assess_escalation_level(text)
         assert level == EscalationLevel.LOW
     
+    def test_assess_levels_batch(self):
+        """Batch assessment should match one-by-one assessment."""
+        answers = [
+            "This is a severe widespread infection.",
+            "Use a fungicide spray.",
+            "Remove the damaged leaves.",
+        ]
+        assert assess_escalation_levels(answers) == [
+            _assess_escalation_level(a) for a in answers
+        ]
+    
     def test_apply_safety_adds_disclaimer(self):
         """Should add disclaimer to all responses."""
         raw = "This looks like water stress."
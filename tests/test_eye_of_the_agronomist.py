@@ -0,0 +1,174 @@
+"""
+tests/test_eye_of_the_agronomist.py
+Unit tests for crop image helpers and prompt utilities.
+"""
+
+import base64
+import os
+import pytest
+import eye_of_the_agronomist
+from eye_of_the_agronomist import (
+    analyze_crop_issue,
+    analyze_crop_issue_bulk,
+    encode_image_to_base64,
+    infer_image_hints,
+    iter_image_base64,
+)
+from llm_client import MockLLMClient
+
+
+@pytest.fixture
+def photo(tmp_path):
+    """A fake photo with non-trivial content (not a multiple of 3 bytes)."""
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(os.urandom(100_001))
+    return path
+
+
+class TestEncodeImage:
+    """Test base64 image encoding."""
+    
+    def test_matches_full_read(self, photo):
+        """Should produce the same output as encoding the whole file."""
+        expected = base64.b64encode(photo.read_bytes()).decode("ascii")
+        assert encode_image_to_base64(str(photo)) == expected
+    
+    def test_empty_file(self, tmp_path):
+        """Should encode an empty file to an empty string."""
+        empty = tmp_path / "empty.jpg"
+        empty.write_bytes(b"")
+        assert encode_image_to_base64(str(empty)) == ""
+    
+    def test_missing_file_raises(self):
+        """Should raise FileNotFoundError for a missing image."""
+        with pytest.raises(FileNotFoundError):
+            encode_image_to_base64("does/not/exist.jpg")
+    
+    def test_streamed_chunks_match_full_encode(self, photo):
+        """Should yield newline-free chunks that join to the one-shot encoding."""
+        chunks = list(iter_image_base64(str(photo), chunk_size=3 * 1024))
+        assert len(chunks) > 1
+        assert b"\n" not in b"".join(chunks)
+        assert b"".join(chunks).decode("ascii") == encode_image_to_base64(str(photo))
+    
+    def test_stream_rejects_unaligned_chunks(self, photo):
+        """Should refuse chunk sizes that would pad mid-stream."""
+        with pytest.raises(ValueError):
+            list(iter_image_base64(str(photo), chunk_size=1000))
+
+
+class TestAnalyzeCropIssue:
+    """Test the analysis pipeline with the offline client."""
+    
+    def test_text_only_client_skips_image_encoding(self, photo, monkeypatch):
+        """Should not base64-encode the photo for a client without vision."""
+        def _fail(image_path):
+            raise AssertionError("image should not be encoded")
+        
+        monkeypatch.setattr(eye_of_the_agronomist, "encode_image_to_base64", _fail)
+        monkeypatch.setattr(eye_of_the_agronomist, "get_llm_client", MockLLMClient)
+        
+        answer = analyze_crop_issue(str(photo), "leaves are wilting", "tomato", "leaf")
+        assert "water" in answer.lower()
+    
+    def test_vision_client_gets_hints_and_encoding(self, photo, monkeypatch):
+        """Should run image hints alongside encoding for vision clients."""
+        prompts = []
+        
+        class VisionClient(MockLLMClient):
+            supports_vision = True
+            
+            def analyze_crop_from_prompt(self, prompt, bypass_cache=False):
+                prompts.append(prompt)
+                return "ok."
+        
+        encoded = []
+        monkeypatch.setattr(eye_of_the_agronomist, "get_llm_client", VisionClient)
+        monkeypatch.setattr(
+            eye_of_the_agronomist, "encode_image_to_base64", lambda path: encoded.append(path) or "b64"
+        )
+        
+        assert analyze_crop_issue(str(photo), "spots", "tomato", "leaf") == "ok."
+        assert encoded == [str(photo)]
+        assert "yellowing" in prompts[0]
+    
+    def test_bulk_without_batch_api_answers_each_job(self, photo, monkeypatch):
+        """Should fall back to one call per job for clients without batch support."""
+        monkeypatch.setattr(eye_of_the_agronomist, "get_llm_client", MockLLMClient)
+        jobs = [
+            {"image_path": str(photo), "farmer_text": text, "crop_type": "tomato", "plant_part": "leaf"}
+            for text in ["leaves are wilting", "holes from caterpillars"] * 6
+        ]
+        
+        answers = analyze_crop_issue_bulk(jobs)
+        assert len(answers) == 12
+        assert "water" in answers[0].lower()
+        assert "insect" in answers[1].lower()
+    
+    def test_bulk_falls_back_when_batch_never_finishes(self, photo, monkeypatch):
+        """Should stop polling at the timeout and answer each job directly."""
+        class StuckBatchClient(MockLLMClient):
+            polls = 0
+            
+            def submit_batch(self, prompts):
+                return "batch-1"
+            
+            def poll_batch(self, batch_id, num_prompts):
+                StuckBatchClient.polls += 1
+                return None
+        
+        monkeypatch.setattr(eye_of_the_agronomist, "get_llm_client", StuckBatchClient)
+        jobs = [
+            {"image_path": str(photo), "farmer_text": "leaves are wilting", "crop_type": "tomato", "plant_part": "leaf"}
+        ] * 12
+        
+        answers = analyze_crop_issue_bulk(jobs, poll_interval=0.01, timeout=0.05)
+        assert StuckBatchClient.polls >= 1
+        assert len(answers) == 12
+        assert all("water" in answer.lower() for answer in answers)
+    
+    def test_bulk_pads_short_batch_result(self, photo, monkeypatch):
+        """Should return one entry per job even if the batch result is short."""
+        class ShortBatchClient(MockLLMClient):
+            def submit_batch(self, prompts):
+                return "batch-1"
+            
+            def poll_batch(self, batch_id, num_prompts):
+                return ["first"]
+        
+        monkeypatch.setattr(eye_of_the_agronomist, "get_llm_client", ShortBatchClient)
+        jobs = [
+            {"image_path": str(photo), "farmer_text": "spots", "crop_type": "tomato", "plant_part": "leaf"}
+        ] * 12
+        
+        assert analyze_crop_issue_bulk(jobs) == ["first"] + [None] * 11
+
+
+class TestImageHints:
+    """Test image hint generation."""
+    
+    def test_missing_image_still_gives_part_hint(self):
+        """Should skip the dimension check quietly when the image is missing."""
+        hint = infer_image_hints("does/not/exist.jpg", "leaf")
+        assert "yellowing" in hint
+    
+    def test_part_hints_by_label(self):
+        """Should pick the hint by plant part, case-insensitively."""
+        assert "rot" in infer_image_hints("does/not/exist.jpg", "Fruit")
+        assert "webbing" in infer_image_hints("does/not/exist.jpg", "insect/pest")
+        assert infer_image_hints("does/not/exist.jpg", "stem") == "Farmer uploaded a crop image."
+    
+    def test_reports_dimensions_from_header(self, tmp_path):
+        """Should report width×height and re-read a file that was replaced."""
+        Image = pytest.importorskip("PIL.Image")
+        path = tmp_path / "leaf.png"
+        Image.new("RGB", (64, 48)).save(path)
+        assert "64×48" in infer_image_hints(str(path), "leaf")
+        
+        Image.new("RGB", (320, 200)).save(path)
+        os.utime(path, ns=(0, 10**18))
+        assert "320×200" in infer_image_hints(str(path), "leaf")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
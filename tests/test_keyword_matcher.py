@@ -0,0 +1,84 @@
+"""
+tests/test_keyword_matcher.py
+Unit tests for the shared multi-pattern keyword matcher.
+"""
+
+import pytest
+import keyword_matcher
+from keyword_matcher import KeywordMatcher
+
+
+GROUPS = {
+    "tomato": ["tomato", "solanum"],
+    "potato": ["potato", "solanum tuberosum"],
+    "corn": ["corn", "grain"],
+    "wheat": ["wheat", "grain"],
+}
+
+
+@pytest.fixture(params=[True, False], ids=["ahocorasick", "regex"])
+def matcher(request, monkeypatch):
+    """Build the matcher with each backend."""
+    if request.param and not keyword_matcher._HAS_AHOCORASICK:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(keyword_matcher, "_HAS_AHOCORASICK", request.param)
+    return KeywordMatcher(GROUPS)
+
+
+class TestKeywordMatcher:
+    """Test keyword and category matching."""
+    
+    def test_finds_substrings(self, matcher):
+        """Should match keywords inside longer words, like `in` does."""
+        assert matcher.find("tomatoes and cornfield") == {"tomato", "corn"}
+    
+    def test_overlapping_keywords(self, matcher):
+        """Should report both a keyword and a longer keyword that contains it."""
+        assert matcher.find("solanum tuberosum") == {"solanum", "solanum tuberosum"}
+    
+    def test_shared_keyword_categories(self, matcher):
+        """Should report every category a shared keyword belongs to."""
+        assert matcher.categories("stored grain") == {"corn", "wheat"}
+    
+    def test_no_match(self, matcher):
+        """Should return an empty set when nothing matches."""
+        assert matcher.find("cabbage") == set()
+        assert matcher.categories("") == set()
+    
+    def test_text_shorter_than_any_keyword(self, matcher):
+        """Should skip the scan for texts shorter than the shortest keyword."""
+        assert matcher.min_length == 4
+        assert matcher.find("cor") == set()
+        assert matcher.find("corn") == {"corn"}
+    
+    def test_scores_in_group_order(self, matcher):
+        """Should count distinct keywords per category, ordered like the groups."""
+        scores = matcher.scores("grain grain wheat and corn")
+        assert list(scores) == ["corn", "wheat"]
+        assert scores == {"corn": 2, "wheat": 2}
+        assert scores.most_common(1) == [("corn", 2)]
+    
+    def test_matches_plain_substring_check(self, matcher):
+        """Should agree with a naive `keyword in text` scan."""
+        keywords = {kw for kws in GROUPS.values() for kw in kws}
+        for text in ["grainy potatoes", "solanumsolanum", "wheatcorn tomato"]:
+            assert matcher.find(text) == {kw for kw in keywords if kw in text}
+
+    
+    def test_find_many_matches_find(self, matcher):
+        """Batch scanning should give the same result as scanning one by one."""
+        texts = ["grainy potatoes", "solanum tuberosum", "", "cabbage", "wheatcorn"]
+        texts *= keyword_matcher.HYPERSCAN_MIN_BATCH
+        assert matcher.find_many(texts) == [matcher.find(t) for t in texts]
+    
+    def test_find_many_without_hyperscan(self, matcher, monkeypatch):
+        """Should fall back to per-text scanning when Hyperscan is missing."""
+        monkeypatch.setattr(keyword_matcher, "_HAS_HYPERSCAN", False)
+        assert matcher.categories_many(["stored grain", "tomato"]) == [
+            {"corn", "wheat"},
+            {"tomato"},
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,8 +3,13 @@ tests/test_llm_client.py
 Unit tests for LLM client functionality.
 """
 
+import asyncio
+import json
+
 import pytest
-from llm_client import MockLLMClient
+import llm_client
+import response_cache
+from llm_client import AsyncGroqLLMClient, GroqLLMClient, MockLLMClient
 
 
 @pytest.fixture
@@ -18,30 +23,30 @@ class TestMockLLMClient:
     def test_water_stress_detection(self, mock_client):
         """Should detect water stress keywords."""
         prompt = 'Farmer description of the problem:\n"""Soil is very dry, plants wilting."""'
-        response = mock_client.analyze_crop_from_prompt(prompt)
-        assert "water stress" in response.lower()
-        assert "water deeply" in response.lower()
+        response = mock_client.analyze_crop_from_prompt(prompt).lower()
+        assert "water stress" in response
+        assert "water deeply" in response
     
     def test_disease_detection(self, mock_client):
         """Should detect disease/spot keywords."""
         prompt = 'Farmer description of the problem:\n"""I see brown spots on leaves."""'
-        response = mock_client.analyze_crop_from_prompt(prompt)
-        assert "disease" in response.lower() or "fungal" in response.lower()
-        assert "remove" in response.lower()
+        response = mock_client.analyze_crop_from_prompt(prompt).lower()
+        assert "disease" in response or "fungal" in response
+        assert "remove" in response
     
     def test_pest_detection(self, mock_client):
         """Should detect insect/pest keywords."""
         prompt = 'Farmer description of the problem:\n"""There are holes and caterpillars."""'
-        response = mock_client.analyze_crop_from_prompt(prompt)
-        assert "insect" in response.lower() or "pest" in response.lower()
-        assert "handpick" in response.lower()
+        response = mock_client.analyze_crop_from_prompt(prompt).lower()
+        assert "insect" in response or "pest" in response
+        assert "handpick" in response
     
     def test_nutrient_detection(self, mock_client):
         """Should detect nutrient deficiency keywords."""
         prompt = 'Farmer description of the problem:\n"""Leaves are yellowing."""'
-        response = mock_client.analyze_crop_from_prompt(prompt)
-        assert "nutrient" in response.lower() or "nitrogen" in response.lower()
-        assert "fertilizer" in response.lower()
+        response = mock_client.analyze_crop_from_prompt(prompt).lower()
+        assert "nutrient" in response or "nitrogen" in response
+        assert "fertilizer" in response
     
     def test_empty_prompt_raises_error(self, mock_client):
         """Should raise ValueError for empty prompt."""
@@ -51,10 +56,215 @@ class TestMockLLMClient:
     def test_fallback_response_for_unknown(self, mock_client):
         """Should return fallback for unknown keywords."""
         prompt = 'Farmer description of the problem:\n"""Plant looks strange."""'
-        response = mock_client.analyze_crop_from_prompt(prompt)
+        response = mock_client.analyze_crop_from_prompt(prompt).lower()
         assert len(response) > 0
         # Should include extracted farmer text
-        assert "based on" in response.lower() or "strange" in response.lower()
+        assert "based on" in response or "strange" in response
+    
+    def test_fallback_is_deterministic(self, mock_client):
+        """Should give the same fallback answer for the same description."""
+        prompt = 'Farmer description of the problem:\n"""Plant looks strange."""'
+        answers = {
+            mock_client.analyze_crop_from_prompt(prompt, bypass_cache=True)
+            for _ in range(5)
+        }
+        assert len(answers) == 1
+    
+    def test_async_mock_accepts_bypass_cache(self, mock_client):
+        """Should take the same keywords as the other clients."""
+        prompt = 'Farmer description of the problem:\n"""Soil is very dry."""'
+        client = llm_client.AsyncMockLLMClient()
+        answer = asyncio.run(client.analyze_crop_from_prompt(prompt, bypass_cache=True))
+        assert answer == mock_client.analyze_crop_from_prompt(prompt)
+
+
+class _FakeResponse:
+    text = ""
+    
+    def __init__(self, content, status_code=200, headers=None):
+        self._content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+    
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+class _FakeSession:
+    """Records calls made through the shared session."""
+    
+    def __init__(self, statuses=()):
+        self.calls = 0
+        self._statuses = list(statuses)
+    
+    def post(self, url, **kwargs):
+        self.calls += 1
+        if self._statuses:
+            return _FakeResponse("", *self._statuses.pop(0))
+        return _FakeResponse(f"answer {self.calls}")
+
+
+class _EchoSession:
+    """Answers each request with its own user prompt."""
+    
+    def post(self, url, **kwargs):
+        return _FakeResponse(kwargs["json"]["messages"][-1]["content"])
+
+
+class TestGroqLLMClient:
+    """Test the sync Groq client without network access."""
+    
+    def test_uses_shared_session(self, monkeypatch):
+        """Should send requests through the pooled session."""
+        session = _FakeSession()
+        monkeypatch.setattr(llm_client, "get_session", lambda: session)
+        monkeypatch.setattr(response_cache, "LLM_CACHE_ENABLED", False)
+        client = GroqLLMClient("test-key")
+        
+        answer = client.analyze_crop_from_prompt("Leaves are yellowing.")
+        assert answer == "answer 1"
+        assert session.calls == 1
+    
+    def test_client_error_is_not_retried(self, monkeypatch):
+        """Should fail on the first 401 instead of retrying."""
+        session = _FakeSession(statuses=[(401,)])
+        monkeypatch.setattr(llm_client, "get_session", lambda: session)
+        monkeypatch.setattr(response_cache, "LLM_CACHE_ENABLED", False)
+        
+        with pytest.raises(llm_client.GroqAPIError) as excinfo:
+            GroqLLMClient("bad-key").analyze_crop_from_prompt("Leaves are yellowing.")
+        assert excinfo.value.status_code == 401
+        assert session.calls == 1
+    
+    def test_rate_limit_honors_retry_after(self, monkeypatch):
+        """Should retry a 429 after the server-provided delay."""
+        session = _FakeSession(statuses=[(429, {"Retry-After": "0"})])
+        monkeypatch.setattr(llm_client, "get_session", lambda: session)
+        monkeypatch.setattr(response_cache, "LLM_CACHE_ENABLED", False)
+        
+        answer = GroqLLMClient("test-key").analyze_crop_from_prompt("Leaves are yellowing.")
+        assert answer == "answer 2"
+        assert session.calls == 2
+
+    def test_batch_preserves_order(self, monkeypatch):
+        """Should answer concurrent prompts in input order."""
+        monkeypatch.setattr(llm_client, "get_session", lambda: _EchoSession())
+        monkeypatch.setattr(response_cache, "LLM_CACHE_ENABLED", False)
+        prompts = [f"prompt {i}" for i in range(10)]
+        
+        answers = GroqLLMClient("test-key").analyze_crop_from_prompt_batch(prompts, max_inflight=4)
+        assert answers == prompts
+
+
+class _FakeBatchResponse:
+    def __init__(self, payload=None, text=""):
+        self.status_code = 200
+        self.headers = {}
+        self._payload = payload
+        self.text = text
+    
+    def json(self):
+        return self._payload
+
+
+class _FakeBatchSession:
+    """Minimal stand-in for the Groq files + batches endpoints."""
+    
+    def __init__(self, answered=None):
+        self.uploaded = b""
+        self.polls = 0
+        self.answered = answered  # only this many prompts get an output row
+    
+    def post(self, url, **kwargs):
+        if url == llm_client.GROQ_FILES_URL:
+            self.uploaded = kwargs["files"]["file"][1]
+            return _FakeBatchResponse({"id": "file-in"})
+        assert kwargs["json"]["input_file_id"] == "file-in"
+        return _FakeBatchResponse({"id": "batch-1"})
+    
+    def get(self, url, **kwargs):
+        if url.endswith("/content"):
+            rows = []
+            for line in self.uploaded.decode().splitlines():
+                req = json.loads(line)
+                prompt = req["body"]["messages"][1]["content"]
+                body = {"choices": [{"message": {"content": f"answer to {prompt}"}}]}
+                rows.append({"custom_id": req["custom_id"], "response": {"status_code": 200, "body": body}})
+            rows = rows[:self.answered]
+            # Output order is not guaranteed by the API
+            return _FakeBatchResponse(text="\n".join(json.dumps(r) for r in reversed(rows)))
+        self.polls += 1
+        if self.polls == 1:
+            return _FakeBatchResponse({"status": "in_progress"})
+        return _FakeBatchResponse({
+            "status": "completed",
+            "output_file_id": "file-out",
+        })
+
+
+class TestGroqBatch:
+    """Test batch submission and result collection."""
+    
+    def test_submit_and_poll(self, monkeypatch):
+        """Should return answers in submission order once the batch completes."""
+        session = _FakeBatchSession()
+        monkeypatch.setattr(llm_client, "get_session", lambda: session)
+        client = GroqLLMClient("test-key")
+        
+        batch_id = client.submit_batch(["a", "b", "c"])
+        assert batch_id == "batch-1"
+        assert client.poll_batch(batch_id, 3) is None
+        assert client.poll_batch(batch_id, 3) == ["answer to a", "answer to b", "answer to c"]
+    
+    def test_poll_pads_missing_answers(self, monkeypatch):
+        """Should return one entry per prompt even when the last ones failed."""
+        session = _FakeBatchSession(answered=1)
+        session.polls = 1
+        monkeypatch.setattr(llm_client, "get_session", lambda: session)
+        client = GroqLLMClient("test-key")
+        
+        batch_id = client.submit_batch(["a", "b", "c"])
+        assert client.poll_batch(batch_id, 3) == ["answer to a", None, None]
+
+
+class TestAsyncGroqLLMClient:
+    """Test the async Groq client against a fake transport."""
+    
+    def test_batch_preserves_order(self):
+        """Should return one answer per prompt, in prompt order."""
+        httpx = pytest.importorskip("httpx")
+        
+        def handler(request):
+            prompt = json.loads(request.content)["messages"][1]["content"]
+            answer = {"choices": [{"message": {"content": f"answer to {prompt}"}}]}
+            return httpx.Response(200, json=answer)
+        
+        async def run():
+            client = AsyncGroqLLMClient(
+                "test-key", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            )
+            try:
+                return await client.analyze_crop_from_prompt_batch(
+                    [f"p{i}" for i in range(20)], max_inflight=4, qpm=0
+                )
+            finally:
+                await client.aclose()
+        
+        answers = asyncio.run(run())
+        assert answers == [f"answer to p{i}" for i in range(20)]
+    
+    def test_empty_key_raises_error(self):
+        """Should refuse to build a client without an API key."""
+        with pytest.raises(ValueError):
+            AsyncGroqLLMClient("")
+    
+    def test_async_mock_fallback(self, monkeypatch):
+        """Should fall back to the async mock without an API key."""
+        monkeypatch.setattr(llm_client, "GROQ_API_KEY", "")
+        client = llm_client.get_async_llm_client()
+        prompt = 'Farmer description of the problem:\n"""Soil is very dry."""'
+        answers = asyncio.run(client.analyze_crop_from_prompt_batch([prompt]))
+        assert "water stress" in answers[0].lower()
 
 
 if __name__ == "__main__":
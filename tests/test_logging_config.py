@@ -0,0 +1,32 @@
+"""
+tests/test_logging_config.py
+Unit tests for the shared logging setup.
+"""
+
+import importlib
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+import logging_config
+
+
+class TestLoggingConfig:
+    """Test that logging is configured exactly once."""
+    
+    def test_reimport_does_not_duplicate_handlers(self):
+        """Should keep a single queue handler across module reloads."""
+        importlib.reload(logging_config)
+        importlib.reload(logging_config)
+        handlers = logging.getLogger("agri_assistant").handlers
+        assert sum(isinstance(h, QueueHandler) for h in handlers) == 1
+    
+    def test_child_loggers_share_parent_handler(self):
+        """Should return module loggers under the app logger."""
+        child = logging_config.get_logger("tests")
+        assert child.name == "agri_assistant.tests"
+        assert not child.handlers
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
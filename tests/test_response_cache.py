@@ -0,0 +1,73 @@
+"""
+tests/test_response_cache.py
+Unit tests for the on-disk response cache.
+"""
+
+import pytest
+import response_cache
+from response_cache import ResponseCache, make_key
+from llm_client import MockLLMClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache" / "responses.sqlite3"), ttl_seconds=60)
+
+
+class TestResponseCache:
+    """Test storage, expiry and key building."""
+    
+    def test_round_trip(self, cache):
+        """Should return what was stored."""
+        cache.set("k", {"answer": "water deeply"})
+        assert cache.get("k") == {"answer": "water deeply"}
+    
+    def test_missing_key(self, cache):
+        """Should return None for unknown keys."""
+        assert cache.get("missing") is None
+    
+    def test_expired_entry(self, cache):
+        """Should ignore entries past their TTL."""
+        cache.set("k", "old", ttl_seconds=-1)
+        assert cache.get("k") is None
+    
+    def test_expired_rows_deleted(self, cache):
+        """Should remove expired rows from the file on the next write."""
+        cache.set("old", "stale", ttl_seconds=-1)
+        cache.set("new", "fresh")
+        keys = [row[0] for row in cache._conn.execute("SELECT key FROM responses")]
+        assert keys == ["new"]
+
+    def test_expired_rows_deleted_on_open(self, tmp_path):
+        """Should purge expired rows left by an earlier process."""
+        path = str(tmp_path / "responses.sqlite3")
+        ResponseCache(path).set("old", "stale", ttl_seconds=-1)
+        reopened = ResponseCache(path)
+        assert reopened._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+
+    def test_oldest_rows_evicted_over_cap(self, tmp_path):
+        """Should keep only the newest max_entries rows."""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=3)
+        for i in range(5):
+            cache.set(f"k{i}", i)
+        cache.set("k2", "rewritten")  # a rewrite counts as the newest write
+        assert [cache.get(f"k{i}") for i in range(5)] == [None, None, "rewritten", 3, 4]
+
+    def test_key_depends_on_every_part(self):
+        """Should give different keys when any input changes."""
+        assert make_key("model", "system", "prompt") == make_key("model", "system", "prompt")
+        assert make_key("model", "system", "prompt") != make_key("model2", "system", "prompt")
+    
+    def test_mock_client_skips_cache(self, cache, monkeypatch):
+        """Should neither read nor write the cache for mock answers."""
+        monkeypatch.setitem(response_cache._caches, response_cache.LLM_CACHE_PATH, cache)
+        prompt = 'Farmer description of the problem:\n"""Plant looks strange."""'
+        cache.set(make_key("mock", prompt), "cached answer")
+        assert MockLLMClient().analyze_crop_from_prompt(prompt) != "cached answer"
+        other = 'Farmer description of the problem:\n"""Leaves are curling."""'
+        MockLLMClient().analyze_crop_from_prompt(other)
+        assert cache.get(make_key("mock", other)) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
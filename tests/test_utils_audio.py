@@ -0,0 +1,76 @@
+"""
+tests/test_utils_audio.py
+Unit tests for audio helper utilities.
+"""
+
+import array
+import os
+import wave
+
+import pytest
+import utils_audio
+from utils_audio import get_silent_wav, write_silent_wav, write_tone_wav
+
+
+class TestWriteSilentWav:
+    """Test the silent WAV placeholder."""
+    
+    def test_writes_silent_mono_16bit(self, tmp_path):
+        """Should write the requested duration of 16-bit mono silence."""
+        path = tmp_path / "silence.wav"
+        write_silent_wav(str(path), seconds=1.5, sample_rate=8000)
+        
+        with wave.open(str(path), "rb") as wf:
+            assert wf.getnchannels() == 1
+            assert wf.getsampwidth() == 2
+            assert wf.getframerate() == 8000
+            assert wf.getnframes() == 12000
+            assert not any(wf.readframes(wf.getnframes()))
+
+
+class TestWriteToneWav:
+    """Test the sine tone writer."""
+    
+    def test_writes_tone(self, tmp_path):
+        """Should write the requested duration of a non-silent tone."""
+        path = tmp_path / "tone.wav"
+        write_tone_wav(str(path), seconds=0.5, sample_rate=8000, freq_hz=440, amplitude=0.5)
+        
+        with wave.open(str(path), "rb") as wf:
+            assert wf.getnframes() == 4000
+            samples = array.array("h", wf.readframes(wf.getnframes()))
+        assert max(samples) <= 0.5 * 32767
+        assert max(samples) > 0.45 * 32767
+    
+    def test_fallback_matches_numpy(self, monkeypatch):
+        """The pure-Python path should produce the same samples."""
+        fast = array.array("h", utils_audio._tone_samples(800, 8000, 440, 0.2))
+        monkeypatch.setattr(utils_audio, "_NUMPY_OK", False)
+        slow = array.array("h", utils_audio._tone_samples(800, 8000, 440, 0.2))
+        assert all(abs(a - b) <= 1 for a, b in zip(fast, slow))
+        assert len(fast) == len(slow) == 800
+
+
+class TestGetSilentWav:
+    """Test the cached silent WAV."""
+    
+    def test_written_once_and_reused(self, tmp_path):
+        """Should return the same file without rewriting it."""
+        first = get_silent_wav(1.0, 8000, str(tmp_path))
+        mtime = os.stat(first).st_mtime_ns
+        second = get_silent_wav(1.0, 8000, str(tmp_path))
+        
+        assert first == second
+        assert os.stat(second).st_mtime_ns == mtime
+        with wave.open(first, "rb") as wf:
+            assert wf.getnframes() == 8000
+    
+    def test_regenerated_if_deleted(self, tmp_path):
+        """Should write the file again if it was removed."""
+        path = get_silent_wav(0.5, 8000, str(tmp_path))
+        os.remove(path)
+        assert os.path.exists(get_silent_wav(0.5, 8000, str(tmp_path)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
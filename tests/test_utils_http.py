@@ -0,0 +1,69 @@
+"""
+tests/test_utils_http.py
+Unit tests for the shared HTTP session.
+"""
+
+import pytest
+from urllib3.util.retry import RequestHistory
+
+from utils_http import _jittered_retry_class, get_session, mount_retries
+
+
+class TestSharedSession:
+    """Test the process-wide session and per-API retries."""
+
+    def test_session_is_shared(self):
+        """Should return the same session on every call."""
+        assert get_session() is get_session()
+
+    def test_default_adapter_does_not_retry(self):
+        """Callers with their own retry loop should not get a second one."""
+        adapter = get_session().get_adapter("https://api.groq.com/openai/v1/chat/completions")
+        assert adapter.max_retries.total == 0
+
+    def test_mount_retries_applies_to_prefix_only(self):
+        """Should retry 429/5xx for the mounted API and nothing else."""
+        mount_retries("https://retry.example.test/", 2)
+        session = get_session()
+
+        retry = session.get_adapter("https://retry.example.test/v1/data").max_retries
+        assert retry.total == 2
+        assert 429 in retry.status_forcelist
+        assert retry.respect_retry_after_header
+        assert session.get_adapter("https://other.example.test/").max_retries.total == 0
+
+    def test_mount_retries_is_idempotent(self):
+        """Mounting the same prefix twice should keep the first adapter."""
+        mount_retries("https://once.example.test/", 1)
+        adapter = get_session().get_adapter("https://once.example.test/")
+        mount_retries("https://once.example.test/", 5)
+        assert get_session().get_adapter("https://once.example.test/") is adapter
+
+
+class TestJitteredRetry:
+    """Test the backoff schedule used by mount_retries."""
+
+    def _after(self, failures):
+        retry = _jittered_retry_class()(total=5, backoff_factor=0.5)
+        error = RequestHistory("GET", "/", None, 503, None)
+        return retry.new(history=(error,) * failures)
+
+    def test_first_retry_waits(self):
+        """Should not retry immediately after the first failure."""
+        for _ in range(20):
+            assert 0.25 <= self._after(1).get_backoff_time() <= 0.5
+
+    def test_backoff_grows_and_is_capped(self):
+        """Should double per failure, jittered, up to MAX_BACKOFF."""
+        cap = _jittered_retry_class().MAX_BACKOFF
+        for _ in range(20):
+            assert 0.5 <= self._after(2).get_backoff_time() <= 1.0
+            assert cap / 2 <= self._after(10).get_backoff_time() <= cap
+
+    def test_jitter_varies_delay(self):
+        """Clients failing together should not all wait the same time."""
+        assert len({self._after(3).get_backoff_time() for _ in range(20)}) > 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,195 @@
+"""
+tests/test_voice_of_the_agronomist.py
+Unit tests for the TTS fallback chain.
+"""
+
+import os
+import sys
+import types
+
+import pytest
+import requests
+
+import voice_of_the_agronomist as voice
+
+
+class TestAgronomistResponseToAudio:
+    """Test the in-memory audio returned alongside the file."""
+
+    @pytest.fixture(autouse=True)
+    def no_remote_tts(self, tmp_path, monkeypatch):
+        """Disable ElevenLabs/pyttsx3 and write into a temp directory."""
+        monkeypatch.setattr(voice, "OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(voice, "ELEVENLABS_API_KEY", "")
+
+        def _fail(text, output_path):
+            raise RuntimeError("no local TTS")
+
+        monkeypatch.setattr(voice, "_local_tts", _fail)
+        monkeypatch.setattr(voice, "_TTS_TIERS", (("local pyttsx3", voice._local_tier),))
+
+    def test_silent_fallback_returns_audio(self):
+        """Silent fallback should return the samples without a disk read."""
+        path, audio = voice.agronomist_response_to_audio("hello", "unused.mp3")
+
+        assert os.path.exists(path)
+        if voice._NUMPY_OK:
+            sample_rate, samples = audio
+            assert sample_rate == voice.SILENT_SAMPLE_RATE
+            assert len(samples) == int(voice.SILENT_SECONDS * sample_rate)
+            assert not samples.any()
+
+    def test_transcript_written_before_return(self):
+        """Should have saved the transcript by the time audio is returned."""
+        voice.agronomist_response_to_audio("water at dawn", "unused.mp3")
+        transcript = os.path.join(voice.OUTPUT_DIR, "agri_reply_transcript.txt")
+        with open(transcript, encoding="utf-8") as f:
+            assert f.read() == "water at dawn"
+
+    def test_unchanged_transcript_not_rewritten(self, monkeypatch):
+        """Saving the same text twice should only write the file once."""
+        voice._save_transcript("spray at dusk")
+        transcript = os.path.join(voice.OUTPUT_DIR, "agri_reply_transcript.txt")
+        writes = []
+        real_open = open
+        monkeypatch.setattr(
+            voice, "open", lambda *a, **kw: writes.append(a) or real_open(*a, **kw), raising=False
+        )
+
+        voice._save_transcript("spray at dusk")
+        assert writes == []
+
+        voice._save_transcript("spray at dawn")
+        assert len(writes) == 1
+        with real_open(transcript, encoding="utf-8") as f:
+            assert f.read() == "spray at dawn"
+
+    def test_transcript_rewritten_if_file_changed(self):
+        """Should write again if the file was edited or removed meanwhile."""
+        voice._save_transcript("spray at dusk")
+        transcript = os.path.join(voice.OUTPUT_DIR, "agri_reply_transcript.txt")
+        os.remove(transcript)
+
+        voice._save_transcript("spray at dusk")
+        with open(transcript, encoding="utf-8") as f:
+            assert f.read() == "spray at dusk"
+    
+    def test_speech_returns_path_only(self):
+        """The path-only entry point should still return an existing file."""
+        path = voice.agronomist_response_to_speech("hello", "unused.mp3")
+        assert os.path.exists(path)
+
+
+class TestTierSelection:
+    """Test which TTS tiers are picked at import."""
+
+    def test_elevenlabs_needs_key_and_voice(self, monkeypatch):
+        """Should only use ElevenLabs when both key and voice are set."""
+        monkeypatch.setattr(voice, "ELEVENLABS_API_KEY", "key")
+        monkeypatch.setattr(voice, "ELEVENLABS_VOICE_ID", "")
+        assert "ElevenLabs" not in dict(voice._select_tiers())
+
+        monkeypatch.setattr(voice, "ELEVENLABS_VOICE_ID", "voice")
+        assert voice._select_tiers()[0] == ("ElevenLabs", voice._elevenlabs_tier)
+
+    def test_silent_when_no_tiers(self, tmp_path, monkeypatch):
+        """Should go straight to the silent WAV when no tier is available."""
+        monkeypatch.setattr(voice, "OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(voice, "_TTS_TIERS", ())
+        path, _ = voice._synthesize("hello", "unused.mp3")
+        assert os.path.exists(path)
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.saved = []
+    
+    def setProperty(self, name, value):
+        pass
+    
+    def save_to_file(self, text, path):
+        self.saved.append((text, path))
+    
+    def runAndWait(self):
+        pass
+
+
+class TestLocalTTS:
+    """Test reuse of the pyttsx3 engine."""
+    
+    def test_engine_initialised_once(self, monkeypatch):
+        """Should init the speech driver once and reuse it across replies."""
+        inits = []
+        
+        def init():
+            inits.append(1)
+            return _FakeEngine()
+        
+        monkeypatch.setitem(sys.modules, "pyttsx3", types.SimpleNamespace(init=init))
+        monkeypatch.setattr(voice, "_tts_engine", None)
+        
+        voice._local_tts("first", "a.wav")
+        voice._local_tts("second", "b.wav")
+        
+        assert len(inits) == 1
+        assert voice._tts_engine.saved == [("first", "a.wav"), ("second", "b.wav")]
+
+
+class _FakeStreamResponse:
+    status_code = 200
+    
+    def __init__(self, chunks):
+        self._chunks = chunks
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def iter_content(self, chunk_size):
+        return iter(self._chunks)
+
+
+class TestElevenLabsStreaming:
+    """Test that ElevenLabs audio is streamed to disk."""
+    
+    def test_chunks_written_in_order(self, tmp_path, monkeypatch):
+        """Should write every streamed chunk and leave no partial file."""
+        calls = []
+        
+        class FakeSession:
+            def post(self, url, **kwargs):
+                calls.append(kwargs)
+                return _FakeStreamResponse([b"ID3", b"abc", b"def"])
+        
+        monkeypatch.setattr(voice, "get_session", FakeSession)
+        out = tmp_path / "reply.mp3"
+        voice._elevenlabs_tts("hello", str(out))
+        
+        assert calls[0]["stream"] is True
+        assert out.read_bytes() == b"ID3abcdef"
+        assert not (tmp_path / "reply.mp3.part").exists()
+    
+    def test_dropped_stream_leaves_no_files(self, tmp_path, monkeypatch):
+        """Should remove the partial file when the stream fails midway."""
+        class DroppedResponse(_FakeStreamResponse):
+            def iter_content(self, chunk_size):
+                yield b"ID3"
+                raise requests.ConnectionError("connection reset")
+        
+        class FakeSession:
+            def post(self, url, **kwargs):
+                return DroppedResponse([])
+        
+        monkeypatch.setattr(voice, "get_session", FakeSession)
+        out = tmp_path / "reply.mp3"
+        with pytest.raises(requests.ConnectionError):
+            voice._elevenlabs_tts("hello", str(out))
+        
+        assert not out.exists()
+        assert not (tmp_path / "reply.mp3.part").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,48 @@
+"""
+tests/test_voice_of_the_farmer.py
+Unit tests for farmer transcription fallbacks.
+"""
+
+import importlib
+
+import pytest
+import voice_of_the_farmer
+from voice_of_the_farmer import (
+    _MOCK_EXAMPLES,
+    _mock_transcription,
+    _shuffled_examples,
+    transcribe_farmer_audio,
+)
+
+
+class TestMockTranscription:
+    """Test the mock transcription used without a Groq key."""
+
+    def test_cycles_through_every_example(self):
+        """Should return each example once before repeating."""
+        picks = [_mock_transcription() for _ in range(len(_MOCK_EXAMPLES))]
+        assert sorted(picks) == sorted(_MOCK_EXAMPLES)
+
+    def test_seed_gives_reproducible_order(self):
+        """Should shuffle the same way for the same seed."""
+        assert list(_shuffled_examples(42)) == list(_shuffled_examples(42))
+
+    def test_zero_is_a_valid_seed(self, monkeypatch):
+        """Should seed the mock order with MOCK_SEED=0 like any other value."""
+        monkeypatch.setenv("MOCK_SEED", "0")
+        module = importlib.reload(voice_of_the_farmer)
+        assert list(module._mock_queue) == list(_shuffled_examples(0))
+
+    def test_empty_path_returns_empty_text(self):
+        """Should not transcribe when no audio path is given."""
+        assert transcribe_farmer_audio("") == ""
+
+    def test_falls_back_to_mock_without_key(self, monkeypatch):
+        """Should use a mock example when GROQ_API_KEY is unset."""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        monkeypatch.setattr(voice_of_the_farmer, "_mock_queue", _shuffled_examples(1))
+        assert transcribe_farmer_audio("farmer.wav") in _MOCK_EXAMPLES
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
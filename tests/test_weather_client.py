@@ -3,19 +3,54 @@ tests/test_weather_client.py
 Unit tests for weather client with caching.
 """
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import requests
 from datetime import datetime
+
+import weather_client
+from response_cache import ResponseCache
 from weather_client import (
     fetch_weather_snapshot,
+    fetch_weather_snapshot_async,
+    fetch_weather_snapshots_async,
+    get_cached_snapshot,
     _assess_weather_risks,
     clear_cache,
     WEATHER_CONFIG,
 )
 
 
+class _FakeStreamResponse:
+    def __init__(self, chunks, headers=None):
+        self._chunks = chunks
+        self.headers = headers or {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    def iter_content(self, chunk_size):
+        return iter(self._chunks)
+
+
 class TestWeatherClient:
     """Test weather client functionality."""
     
+    @pytest.fixture(autouse=True)
+    def memory_only(self, monkeypatch):
+        """Keep tests off the on-disk cache unless a test opts in."""
+        monkeypatch.setattr(weather_client, "get_weather_cache", lambda: None)
+    
     def teardown_method(self):
         """Clear cache after each test."""
         clear_cache()
@@ -29,6 +64,265 @@ class TestWeatherClient:
         # Should be exactly same object if cached
         assert result1 is result2
     
+    def test_async_fetch_shares_cache(self):
+        """Async fetch should return the same cached snapshot as the sync one."""
+        result1 = fetch_weather_snapshot(35.5, -80.0)
+        result2 = asyncio.run(fetch_weather_snapshot_async(35.5, -80.0))
+        assert result2 is result1
+
+    def test_async_fetch_on_miss(self):
+        """Async fetch should populate the cache on a miss."""
+        result = asyncio.run(fetch_weather_snapshot_async(12.9, 77.6))
+        assert "summary_text" in result
+        assert get_cached_snapshot(12.9, 77.6) is result
+
+    def test_async_fetch_many_locations(self, monkeypatch):
+        """Should fetch each ~1 km cell once and keep input order."""
+        calls = []
+        
+        def fake_fetch(lat, lon):
+            calls.append((lat, lon))
+            return {"summary_text": f"{lat},{lon}"}
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", fake_fetch)
+        locations = [(12.9, 77.6), (35.5, -80.0), (12.9001, 77.6001)]
+        results = asyncio.run(fetch_weather_snapshots_async(locations))
+        
+        assert len(calls) == 2
+        assert results[0] is results[2]
+        assert results[1]["summary_text"] == "35.5,-80.0"
+
+    def test_nearby_point_across_cell_boundary_hits(self):
+        """Should reuse a neighbouring cell fetched a few metres away."""
+        result1 = fetch_weather_snapshot(12.97499, 77.59)
+        assert get_cached_snapshot(12.97501, 77.59) is result1
+
+    def test_distant_neighbor_cell_misses(self):
+        """Should not reuse a neighbouring cell fetched too far away."""
+        fetch_weather_snapshot(12.966, 77.59)
+        assert get_cached_snapshot(12.984, 77.59) is None
+
+    def test_cache_evicts_least_recently_used(self, monkeypatch):
+        """Should cap the cache, dropping the least recently used cell."""
+        monkeypatch.setitem(WEATHER_CONFIG, "CACHE_MAX_ENTRIES", 2)
+        first = fetch_weather_snapshot(10.0, 10.0)
+        fetch_weather_snapshot(20.0, 20.0)
+        get_cached_snapshot(10.0, 10.0)  # touch: 20,20 is now the oldest
+        fetch_weather_snapshot(30.0, 30.0)
+        
+        assert get_cached_snapshot(10.0, 10.0) is first
+        assert get_cached_snapshot(20.0, 20.0) is None
+        assert get_cached_snapshot(30.0, 30.0) is not None
+
+    def test_expired_entry_is_dropped(self, monkeypatch):
+        """Should miss once the cache duration has passed."""
+        monkeypatch.setitem(WEATHER_CONFIG, "CACHE_DURATION_MINUTES", 0)
+        fetch_weather_snapshot(10.0, 10.0)
+        assert get_cached_snapshot(10.0, 10.0) is None
+
+    def test_concurrent_misses_share_one_fetch(self, monkeypatch):
+        """Concurrent misses for the same cell should make a single call."""
+        calls = []
+        
+        def slow_fetch(lat, lon):
+            calls.append((lat, lon))
+            time.sleep(0.2)
+            return {"summary_text": "shared"}
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", slow_fetch)
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: fetch_weather_snapshot(12.9, 77.6), range(5)))
+        
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert not weather_client._inflight
+
+    def test_wall_clock_jump_does_not_expire(self, monkeypatch):
+        """In-memory expiry should use the monotonic clock."""
+        first = fetch_weather_snapshot(10.0, 10.0)
+        real_time = time.time
+        monkeypatch.setattr(time, "time", lambda: real_time() + 24 * 3600)
+        assert get_cached_snapshot(10.0, 10.0) is first
+
+    def test_expiry_follows_observation_time(self):
+        """Should keep a reading until the next upstream refresh."""
+        now = time.time()
+        refresh = WEATHER_CONFIG["OWM_UPDATE_SECONDS"]
+        
+        fresh = weather_client._expires_at({"observed_at": now - 60})
+        assert fresh == pytest.approx(now - 60 + refresh, abs=1)
+        
+        stale = weather_client._expires_at({"observed_at": now - 10 * refresh})
+        assert stale == pytest.approx(now + WEATHER_CONFIG["MIN_CACHE_SECONDS"], abs=1)
+        
+        fallback = weather_client._expires_at({"observed_at": None})
+        assert fallback == pytest.approx(now + WEATHER_CONFIG["CACHE_DURATION_MINUTES"] * 60, abs=1)
+
+    def test_parse_reports_observation_time(self):
+        """Should carry the API's observation time through parsing."""
+        parsed = weather_client._parse_weather_response(
+            {"current": {"dt": 1700000000, "humidity": 50, "temp": 25}}
+        )
+        assert parsed["observed_at"] == 1700000000
+
+    def test_disk_cache_survives_restart(self, tmp_path, monkeypatch):
+        """Should serve a real reading from disk after memory is lost."""
+        disk = ResponseCache(str(tmp_path / "weather.sqlite3"))
+        monkeypatch.setattr(weather_client, "get_weather_cache", lambda: disk)
+        calls = []
+        
+        def fake_fetch(lat, lon):
+            calls.append((lat, lon))
+            return {"summary_text": "dry", "observed_at": time.time()}
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", fake_fetch)
+        first = fetch_weather_snapshot(12.9, 77.6)
+        with weather_client._weather_cache_lock:
+            weather_client._weather_cache.clear()  # simulate a restart
+        
+        assert fetch_weather_snapshot(12.9, 77.6) == first
+        assert len(calls) == 1
+
+    def test_disk_not_read_under_inflight_lock(self, tmp_path, monkeypatch):
+        """Should do disk-cache I/O outside the single-flight lock."""
+        locked_reads = []
+        
+        class WatchedDisk(ResponseCache):
+            def get(self, key):
+                locked_reads.append(weather_client._inflight_lock.locked())
+                return super().get(key)
+        
+        disk = WatchedDisk(str(tmp_path / "weather.sqlite3"))
+        monkeypatch.setattr(weather_client, "get_weather_cache", lambda: disk)
+        monkeypatch.setattr(
+            weather_client, "_fetch_weather_with_retry",
+            lambda lat, lon: {"summary_text": "dry", "observed_at": time.time()},
+        )
+        fetch_weather_snapshot(12.9, 77.6)
+        
+        assert locked_reads and not any(locked_reads)
+
+    def test_fallback_not_persisted(self, tmp_path, monkeypatch):
+        """Should keep fallback responses out of the on-disk cache."""
+        disk = ResponseCache(str(tmp_path / "weather.sqlite3"))
+        monkeypatch.setattr(weather_client, "get_weather_cache", lambda: disk)
+        monkeypatch.setattr(weather_client, "WEATHER_API_KEY", "")
+        
+        fetch_weather_snapshot(12.9, 77.6)
+        assert disk.get(weather_client._disk_key(weather_client._cache_key(12.9, 77.6))) is None
+
+    def test_parse_sums_next_hour_precipitation(self):
+        """Should sum only the first 60 minutely readings, exactly."""
+        minutely = [{"precipitation": 0.1}] * 60 + [{"precipitation": 5.0}, {}]
+        parsed = weather_client._parse_weather_response({"current": {}, "minutely": minutely})
+        assert parsed["rain_mm_next_hour"] == 6.0
+
+    def test_request_uses_query_params(self, monkeypatch):
+        """Should call the fixed OneCall URL with the location as params."""
+        calls = []
+        
+        class FakeSession:
+            def get(self, url, **kwargs):
+                calls.append((url, kwargs))
+                return _FakeStreamResponse([b'{"current": {"dt": 1700000000}}'])
+        
+        monkeypatch.setattr(weather_client, "get_session", FakeSession)
+        monkeypatch.setattr(weather_client, "mount_retries", lambda *a: None)
+        monkeypatch.setattr(weather_client, "WEATHER_API_KEY", "k&y")
+        weather_client._fetch_from_openweathermap(12.9, 77.6)
+        
+        url, kwargs = calls[0]
+        assert url == weather_client.OWM_ONECALL_URL
+        assert kwargs["params"]["lat"] == 12.9
+        assert kwargs["params"]["appid"] == "k&y"
+        assert kwargs["stream"] is True
+
+    def test_oversized_response_rejected(self):
+        """Should stop reading once the body passes the size cap."""
+        resp = _FakeStreamResponse([b"x" * 600, b"x" * 600])
+        with pytest.raises(requests.RequestException):
+            weather_client._read_capped(resp, 1000)
+
+    def test_oversized_content_length_rejected(self):
+        """Should refuse a body whose declared length is over the cap."""
+        resp = _FakeStreamResponse([b"{}"], headers={"Content-Length": "5000"})
+        with pytest.raises(requests.RequestException):
+            weather_client._read_capped(resp, 1000)
+        assert weather_client._read_capped(_FakeStreamResponse([b"{}"]), 1000) == b"{}"
+
+    def test_json_decode_without_orjson(self, monkeypatch):
+        """Should fall back to the stdlib decoder when orjson is missing."""
+        monkeypatch.setattr(weather_client, "_HAS_ORJSON", False)
+        assert weather_client._json_loads(b'{"current": {"temp": 25.5}}') == {"current": {"temp": 25.5}}
+
+    def test_async_fetch_many_limits_concurrency(self, monkeypatch):
+        """Should keep at most max_concurrent fetches in flight."""
+        lock = threading.Lock()
+        active = []
+        peak = []
+        
+        def slow_fetch(lat, lon):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return {"summary_text": f"{lat},{lon}"}
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", slow_fetch)
+        locations = [(float(i), float(i)) for i in range(8)]
+        results = asyncio.run(fetch_weather_snapshots_async(locations, max_concurrent=3))
+        
+        assert max(peak) <= 3
+        assert [r["summary_text"] for r in results] == [f"{i}.0,{i}.0" for i in range(8)]
+
+    def _wait_for_refresh(self):
+        """Block until background refreshes have finished."""
+        for _ in range(200):
+            if not weather_client._inflight:
+                return
+            time.sleep(0.01)
+        raise AssertionError("background refresh did not finish")
+
+    def test_stale_entry_served_while_refreshing(self, monkeypatch):
+        """Should return the stale snapshot at once and refresh it behind."""
+        readings = iter(["first", "second"])
+        
+        def fake_fetch(lat, lon):
+            return {"summary_text": next(readings), "observed_at": time.time()}
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", fake_fetch)
+        monkeypatch.setitem(WEATHER_CONFIG, "REFRESH_AHEAD_FRACTION", 0)
+        
+        assert fetch_weather_snapshot(12.9, 77.6)["summary_text"] == "first"
+        assert fetch_weather_snapshot(12.9, 77.6)["summary_text"] == "first"
+        self._wait_for_refresh()
+        assert get_cached_snapshot(12.9, 77.6)["summary_text"] == "second"
+
+    def test_failed_refresh_keeps_cached_reading(self, monkeypatch):
+        """A fallback from a background refresh should not replace real data."""
+        results = iter([
+            {"summary_text": "real", "observed_at": time.time()},
+            {"summary_text": "Weather API unavailable", "observed_at": None},
+        ])
+        calls = []
+        
+        def fake_fetch(lat, lon):
+            calls.append(1)
+            return next(results)
+        
+        monkeypatch.setattr(weather_client, "_fetch_weather_with_retry", fake_fetch)
+        monkeypatch.setitem(WEATHER_CONFIG, "REFRESH_AHEAD_FRACTION", 0)
+        
+        fetch_weather_snapshot(12.9, 77.6)
+        get_cached_snapshot(12.9, 77.6)
+        self._wait_for_refresh()
+        
+        assert get_cached_snapshot(12.9, 77.6)["summary_text"] == "real"
+        self._wait_for_refresh()
+        assert len(calls) == 2  # no further refresh after the failure
+
     def test_cache_clear(self):
         """Should clear cache when requested."""
         fetch_weather_snapshot(35.5, -80.0)
@@ -46,6 +340,19 @@ class TestWeatherClient:
         # Different locations should not be same object
         assert result1 is not result2
     
+    def test_nearby_locations_share_cache(self):
+        """Should reuse the cached snapshot for coordinates within ~1 km."""
+        result1 = fetch_weather_snapshot(35.5, -80.0)
+        result2 = fetch_weather_snapshot(35.5012, -80.0031)
+        
+        assert result1 is result2
+    
+    def test_get_cached_snapshot_does_not_fetch(self):
+        """Should only report what is already cached."""
+        assert get_cached_snapshot(35.5, -80.0) is None
+        result = fetch_weather_snapshot(35.5, -80.0)
+        assert get_cached_snapshot(35.5, -80.0) is result
+    
     def test_assess_weather_risks_high_humidity(self):
         """Should detect high humidity risk."""
         risks = _assess_weather_risks(humidity=85, temp_c=25, rain_last_hour=0, rain_next_hour=0)
@@ -77,6 +384,25 @@ class TestWeatherClient:
         # No risks, so may be empty or have neutral message
         assert risks is not None
 
+    def test_assess_weather_risks_freezing(self):
+        """0 °C is a real reading and should flag low temperature."""
+        risks = _assess_weather_risks(humidity=50, temp_c=0, rain_last_hour=0, rain_next_hour=0)
+        assert risks == ("Low temperature can slow nutrient uptake.",)
+
+    def test_assess_weather_risks_missing_readings(self):
+        """Missing readings should not raise any risk."""
+        assert _assess_weather_risks(humidity=None, temp_c=None, rain_last_hour=None, rain_next_hour=None) == ()
+
+    def test_assess_weather_risks_memoized(self):
+        """Repeated readings should reuse the cached, immutable result."""
+        first = _assess_weather_risks(humidity=85, temp_c=35, rain_last_hour=0, rain_next_hour=0)
+        second = _assess_weather_risks(humidity=85, temp_c=35, rain_last_hour=0, rain_next_hour=0)
+        assert isinstance(first, tuple)
+        assert second is first
+
+        clear_cache()
+        assert _assess_weather_risks.cache_info().currsize == 0
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
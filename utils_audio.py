@@ -3,9 +3,23 @@ utils_audio.py
 Audio helper utilities.
 """
 
+import array
+import math
 import os
+import sys
+import threading
 import wave
-import struct
+from typing import Dict, Tuple
+
+try:
+    import numpy as np
+    _NUMPY_OK = True
+except ImportError:
+    _NUMPY_OK = False
+
+# (directory, seconds, sample_rate) -> path of an already written silent WAV
+_SILENT_CACHE: Dict[Tuple[str, float, int], str] = {}
+_silent_lock = threading.Lock()
 
 
 def ensure_dir(path: str):
@@ -26,5 +40,83 @@ def write_silent_wav(filepath: str, seconds: float = 2.0, sample_rate: int = 160
         wf.setsampwidth(2)            # 16-bit
         wf.setframerate(sample_rate)
 
-        for _ in range(num_samples):
-            wf.writeframes(struct.pack('<h', 0))  # 16-bit little-endian zero
+        # All samples at once: 16-bit zeros are just zero bytes
+        wf.writeframes(bytes(2 * num_samples))
+
+
+def _tone_samples(num_samples: int, sample_rate: int, freq_hz: float, amplitude: float) -> bytes:
+    """16-bit little-endian samples of a sine tone (vectorised with numpy)."""
+    peak = amplitude * 32767
+    if _NUMPY_OK:
+        t = np.arange(num_samples) / sample_rate
+        return (peak * np.sin(2 * np.pi * freq_hz * t)).astype("<i2").tobytes()
+
+    step = 2 * math.pi * freq_hz / sample_rate
+    samples = array.array("h", (int(peak * math.sin(step * i)) for i in range(num_samples)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def write_tone_wav(
+    filepath: str,
+    seconds: float = 1.0,
+    sample_rate: int = 16000,
+    freq_hz: float = 440.0,
+    amplitude: float = 0.2,
+):
+    """
+    Write a mono 16-bit sine tone, e.g. an audible cue instead of silence.
+    The samples are generated in one vectorised numpy call (plain Python
+    fallback without numpy) and written in a single writeframes().
+    
+    Args:
+        filepath: Output WAV path
+        seconds: Duration
+        sample_rate: Samples per second
+        freq_hz: Tone frequency
+        amplitude: Peak level, 0..1 of full scale
+    """
+    ensure_dir(os.path.dirname(filepath))
+
+    num_samples = int(seconds * sample_rate)
+
+    with wave.open(filepath, "w") as wf:
+        wf.setnchannels(1)            # mono
+        wf.setsampwidth(2)            # 16-bit
+        wf.setframerate(sample_rate)
+        wf.writeframes(_tone_samples(num_samples, sample_rate, freq_hz, amplitude))
+
+
+def get_silent_wav(
+    seconds: float = 2.0,
+    sample_rate: int = 16000,
+    cache_dir: str = os.path.join("output_audio", "_silent_cache"),
+) -> str:
+    """
+    Return the path of a silent WAV, writing it only the first time.
+    Every fallback reply shares the same file instead of rewriting it.
+    
+    Args:
+        seconds: Duration of silence
+        sample_rate: Samples per second
+        cache_dir: Directory holding the cached files
+        
+    Returns:
+        Path to the silent WAV
+    """
+    key = (cache_dir, seconds, sample_rate)
+    path = _SILENT_CACHE.get(key)
+    if path and os.path.exists(path):
+        return path
+
+    with _silent_lock:
+        path = os.path.join(cache_dir, f"silence_{seconds:g}s_{sample_rate}hz.wav")
+        if not os.path.exists(path):
+            # Write aside and rename, so a concurrent reader never sees a
+            # half-written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            write_silent_wav(tmp_path, seconds=seconds, sample_rate=sample_rate)
+            os.replace(tmp_path, path)
+        _SILENT_CACHE[key] = path
+    return path
@@ -0,0 +1,13 @@
+"""
+utils_concurrency.py
+Shared worker pool for overlapping independent I/O (weather, transcription,
+image reads) within a request.
+"""
+
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+# One pool for the whole process: threads stay warm across requests instead of
+# being created and torn down on every call
+EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agri")
+atexit.register(EXECUTOR.shutdown, wait=False)
@@ -0,0 +1,111 @@
+"""
+utils_http.py
+Shared HTTP session so API calls reuse pooled keep-alive connections instead
+of paying DNS + TCP + TLS setup on every request.
+
+requests is imported when the session is first built, so modules that only
+run offline / mock paths don't pay its import time.
+"""
+
+import atexit
+import random
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+_retry_prefixes = set()
+_JitteredRetry = None
+
+
+def _build_session() -> "requests.Session":
+    """Create a session with a connection pool sized for concurrent callers."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # Retries are handled by the callers (tenacity), or per API via
+    # mount_retries()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> "requests.Session":
+    """
+    Get the process-wide HTTP session, creating it on first use.
+
+    Returns:
+        Shared requests.Session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+                atexit.register(_session.close)
+    return _session
+
+
+def _jittered_retry_class():
+    """Build (once) a urllib3 Retry whose backoff is exponential with jitter."""
+    global _JitteredRetry
+    if _JitteredRetry is None:
+        from urllib3.util.retry import Retry
+
+        class JitteredRetry(Retry):
+            """
+            Retry with "equal jitter" backoff: the n-th retry waits between
+            half and all of backoff_factor * 2**(n-1), capped at MAX_BACKOFF.
+            Unlike plain Retry, the first retry also waits, and clients that
+            failed together don't retry in lockstep.
+            """
+
+            MAX_BACKOFF = 4.0
+
+            def get_backoff_time(self) -> float:
+                errors = 0
+                for attempt in reversed(self.history):
+                    if attempt.redirect_location is not None:
+                        break
+                    errors += 1
+                if errors == 0:
+                    return 0.0
+                ceiling = min(self.MAX_BACKOFF, self.backoff_factor * 2 ** (errors - 1))
+                return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+        _JitteredRetry = JitteredRetry
+    return _JitteredRetry
+
+
+def mount_retries(prefix: str, retries: int, backoff_factor: float = 0.5) -> None:
+    """
+    Retry requests to one API inside the connection pool (urllib3 Retry),
+    for callers without their own retry loop. Connection errors, 429 and 5xx
+    are retried with jittered exponential backoff, honouring Retry-After.
+    Idempotent per prefix.
+
+    Args:
+        prefix: URL prefix to apply it to, e.g. "https://api.example.com/"
+        retries: Retries after the first attempt
+        backoff_factor: Base of the exponential backoff, in seconds
+    """
+    if prefix in _retry_prefixes:
+        return
+    from requests.adapters import HTTPAdapter
+
+    retry = _jittered_retry_class()(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    session = get_session()
+    with _session_lock:
+        if prefix not in _retry_prefixes:
+            session.mount(prefix, HTTPAdapter(pool_maxsize=16, max_retries=retry))
+            _retry_prefixes.add(prefix)
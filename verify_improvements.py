@@ -32,8 +32,8 @@ try:
         'Farmer description of the problem:\n"""Soil is dry"""',
     ]
     
-    for i, prompt in enumerate(test_prompts, 1):
-        result = client.analyze_crop_from_prompt(prompt)
+    results = client.analyze_crop_from_prompt_batch(test_prompts)
+    for i, result in enumerate(results, 1):
         print(f"  Test {i}: {result.split(chr(10))[0][:60]}...")
     
     print("[OK] LLM Client works\n")
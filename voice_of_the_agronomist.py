@@ -8,26 +8,50 @@ TTS Strategy (3-tier fallback):
 3. Silent WAV (fallback, user sees text)
 """
 
+import hashlib
+import importlib.util
 import os
-import requests
-from dotenv import load_dotenv
+import threading
+from typing import Optional, Tuple
 
-from utils_audio import ensure_dir, write_silent_wav
+from config import load_env
+
+try:
+    import numpy as np
+    _NUMPY_OK = True
+except ImportError:
+    _NUMPY_OK = False
+
+from utils_audio import ensure_dir, get_silent_wav
+from utils_concurrency import EXECUTOR
+from utils_http import get_session
 from logging_config import get_logger
 
 logger = get_logger("voice_of_the_agronomist")
 
-load_dotenv()
+load_env()
 
 # Configuration
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "")
 OUTPUT_DIR = "output_audio"
+STREAM_CHUNK_BYTES = 64 * 1024
+SILENT_SECONDS = 2.0
+SILENT_SAMPLE_RATE = 16000
+
+# (path, text digest, size, mtime_ns) of the last transcript we wrote
+_last_transcript = None
+_transcript_lock = threading.Lock()
+
+# Shared pyttsx3 engine (see _get_tts_engine)
+_tts_engine = None
+_tts_lock = threading.Lock()
 
 
 def _elevenlabs_tts(text: str, output_path: str) -> None:
     """
-    Call ElevenLabs API for TTS.
+    Call ElevenLabs API for TTS. The MP3 is streamed to disk as it arrives
+    rather than buffered in memory.
     
     Args:
         text: Text to convert to speech
@@ -54,25 +78,60 @@ def _elevenlabs_tts(text: str, output_path: str) -> None:
         },
     }
 
+    import requests  # deferred: only the ElevenLabs tier needs it
+
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=30)
-        if resp.status_code != 200:
-            error_msg = f"ElevenLabs failed: {resp.status_code}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+        with get_session().post(
+            url, json=payload, headers=headers, timeout=30, stream=True
+        ) as resp:
+            if resp.status_code != 200:
+                error_msg = f"ElevenLabs failed: {resp.status_code}"
+                logger.error(error_msg)
+                raise RuntimeError(error_msg)
 
-        with open(output_path, "wb") as f:
-            f.write(resp.content)
-        logger.info(f"ElevenLabs TTS created: {output_path}")
+            # Write aside and rename, so a dropped connection never leaves a
+            # truncated MP3 at output_path
+            tmp_path = output_path + ".part"
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+                        f.write(chunk)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        logger.info("ElevenLabs TTS created: %s", output_path)
 
     except requests.RequestException as e:
-        logger.error(f"ElevenLabs network error: {e}")
+        logger.error("ElevenLabs network error: %s", e)
         raise
 
 
+def _get_tts_engine():
+    """
+    Get the process-wide pyttsx3 engine, initialising the speech driver
+    on first use. Call with _tts_lock held.
+    
+    Raises:
+        ImportError: If pyttsx3 not installed
+    """
+    global _tts_engine
+    if _tts_engine is None:
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        engine.setProperty('rate', 150)  # Slow down for clarity
+        engine.setProperty('volume', 0.9)
+        _tts_engine = engine
+    return _tts_engine
+
+
 def _local_tts(text: str, output_path: str) -> None:
     """
     Local TTS using pyttsx3 (free, offline).
+    The engine is created once and reused; calls are serialised because
+    pyttsx3 engines are not thread-safe.
     
     Args:
         text: Text to convert to speech
@@ -83,76 +142,148 @@ def _local_tts(text: str, output_path: str) -> None:
         RuntimeError: If TTS fails
     """
     try:
-        import pyttsx3
+        with _tts_lock:
+            engine = _get_tts_engine()
+            engine.save_to_file(text, output_path)
+            engine.runAndWait()
         
-        engine = pyttsx3.init()
-        engine.setProperty('rate', 150)  # Slow down for clarity
-        engine.setProperty('volume', 0.9)
-        
-        engine.save_to_file(text, output_path)
-        engine.runAndWait()
-        
-        logger.info(f"Local TTS created: {output_path}")
+        logger.info("Local TTS created: %s", output_path)
 
     except ImportError:
         logger.error("pyttsx3 not installed. Cannot use local TTS.")
         raise ImportError("pyttsx3 required for local TTS")
     except Exception as e:
-        logger.error(f"Local TTS error: {e}")
+        logger.error("Local TTS error: %s", e)
         raise RuntimeError(f"Local TTS failed: {e}") from e
 
 
 def _save_transcript(answer_text: str) -> None:
     """
     Save response text to file for debugging/reference.
+    Skips the write when the file still holds this exact text from our
+    previous call (e.g. re-rendering the same answer).
     
     Args:
         answer_text: Text to save
     """
+    global _last_transcript
     try:
         transcript_path = os.path.join(OUTPUT_DIR, "agri_reply_transcript.txt")
-        with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write(answer_text)
-        logger.debug(f"Transcript saved: {transcript_path}")
+        digest = hashlib.blake2b(answer_text.encode("utf-8"), digest_size=8).digest()
+        with _transcript_lock:
+            if _last_transcript is not None and _last_transcript[:2] == (transcript_path, digest):
+                try:
+                    st = os.stat(transcript_path)
+                    if (st.st_size, st.st_mtime_ns) == _last_transcript[2:]:
+                        logger.debug("Transcript unchanged: %s", transcript_path)
+                        return
+                except OSError:
+                    pass
+            with open(transcript_path, "w", encoding="utf-8") as f:
+                f.write(answer_text)
+            st = os.stat(transcript_path)
+            _last_transcript = (transcript_path, digest, st.st_size, st.st_mtime_ns)
+        logger.debug("Transcript saved: %s", transcript_path)
     except Exception as e:
-        logger.warning(f"Could not save transcript: {e}")
+        logger.warning("Could not save transcript: %s", e)
 
 
-def agronomist_response_to_speech(answer_text: str, output_path: str) -> str:
+def agronomist_response_to_audio(
+    answer_text: str, output_path: str
+) -> Tuple[str, Optional[Tuple[int, "np.ndarray"]]]:
     """
     Main entry point. Try TTS in order: ElevenLabs → Local → Silent fallback.
-    Always returns a path that exists.
+    Blocks until the audio file is fully written, and always returns a path
+    that exists. When the tier already has the audio in memory it is returned
+    too, so the caller does not need to read the file back.
     
     Args:
         answer_text: Final agronomy guidance text
         output_path: Preferred output path for audio
         
     Returns:
-        Path to audio file (may be different from output_path if fallback used)
+        (path, audio) where path is the audio file (may be different from
+        output_path if fallback used) and audio is (sample_rate, samples),
+        or None if only the file is available (ElevenLabs, local pyttsx3)
     """
     ensure_dir(OUTPUT_DIR)
-    _save_transcript(answer_text)
+    # The transcript is written on a worker while the TTS call is in flight
+    transcript_future = EXECUTOR.submit(_save_transcript, answer_text)
+    try:
+        return _synthesize(answer_text, output_path)
+    finally:
+        transcript_future.result()
+
 
-    # 1. Try ElevenLabs if configured
+def _elevenlabs_tier(answer_text: str, output_path: str) -> Tuple[str, None]:
+    """TTS tier 1: ElevenLabs MP3 at output_path."""
+    _elevenlabs_tts(answer_text, output_path)
+    return output_path, None
+
+
+def _local_tier(answer_text: str, output_path: str) -> Tuple[str, None]:
+    """TTS tier 2: local pyttsx3 WAV in OUTPUT_DIR."""
+    local_wav = os.path.join(OUTPUT_DIR, "agri_reply_local.wav")
+    _local_tts(answer_text, local_wav)
+    return local_wav, None
+
+
+def _select_tiers() -> tuple:
+    """
+    Pick the TTS tiers this process can use. Keys and installed packages
+    don't change while the app runs, so this is decided once at import.
+    
+    Returns:
+        Tuple of (name, tier function), best first
+    """
+    tiers = []
     if ELEVENLABS_API_KEY and ELEVENLABS_VOICE_ID:
+        tiers.append(("ElevenLabs", _elevenlabs_tier))
+    if importlib.util.find_spec("pyttsx3") is not None:
+        tiers.append(("local pyttsx3", _local_tier))
+    return tuple(tiers)
+
+
+_TTS_TIERS = _select_tiers()
+
+
+def _synthesize(
+    answer_text: str, output_path: str
+) -> Tuple[str, Optional[Tuple[int, "np.ndarray"]]]:
+    """Run the TTS fallback chain (see agronomist_response_to_audio)."""
+    # 1./2. ElevenLabs and local pyttsx3, whichever are configured
+    for name, tier in _TTS_TIERS:
         try:
-            _elevenlabs_tts(answer_text, output_path)
-            logger.info("Using ElevenLabs TTS")
-            return output_path
+            result = tier(answer_text, output_path)
+            logger.info("Using %s TTS", name)
+            return result
         except Exception as e:
-            logger.warning(f"ElevenLabs failed: {e}. Trying next TTS option...")
+            logger.warning("%s TTS failed: %s. Trying next TTS option...", name, e)
 
-    # 2. Try local pyttsx3
-    try:
-        local_wav = os.path.join(OUTPUT_DIR, "agri_reply_local.wav")
-        _local_tts(answer_text, local_wav)
-        logger.info("Using local pyttsx3 TTS")
-        return local_wav
-    except Exception as e:
-        logger.warning(f"Local TTS failed: {e}. Falling back to silent audio...")
-
-    # 3. Fallback: create silent WAV
+    # 3. Fallback: shared silent WAV (written once)
     logger.warning("All TTS options failed. Using silent audio fallback.")
-    fallback_wav = os.path.join(OUTPUT_DIR, "fallback_silence.wav")
-    write_silent_wav(fallback_wav, seconds=2.0)
-    return fallback_wav
+    fallback_wav = get_silent_wav(
+        SILENT_SECONDS, SILENT_SAMPLE_RATE, os.path.join(OUTPUT_DIR, "_silent_cache")
+    )
+    silence = None
+    if _NUMPY_OK:
+        silence = (
+            SILENT_SAMPLE_RATE,
+            np.zeros(int(SILENT_SECONDS * SILENT_SAMPLE_RATE), dtype=np.int16),
+        )
+    return fallback_wav, silence
+
+
+def agronomist_response_to_speech(answer_text: str, output_path: str) -> str:
+    """
+    Synthesize speech and return only the audio file path.
+    See agronomist_response_to_audio for the TTS fallback order.
+    
+    Args:
+        answer_text: Final agronomy guidance text
+        output_path: Preferred output path for audio
+        
+    Returns:
+        Path to audio file (may be different from output_path if fallback used)
+    """
+    return agronomist_response_to_audio(answer_text, output_path)[0]
@@ -9,11 +9,42 @@ Provides:
 
 import os
 import random
-from dotenv import load_dotenv
+from collections import deque
+from config import load_env
 from logging_config import get_logger
 
 logger = get_logger("voice_of_the_farmer")
-load_dotenv()
+load_env()
+
+_MOCK_EXAMPLES = (
+    "My tomato leaves have yellow spots after heavy rain. What should I do?",
+    "I see small holes in the leaves and some insects underneath. How do I fix this?",
+    "The soil is very dry and my plants are starting to wilt. I need help.",
+    "There's a white powdery substance on the leaves. Is this a disease?",
+    "My corn plants are yellowing from the bottom. What nutrient are they missing?",
+    "I noticed brown lesions on the cotton leaves that are spreading. What can I do?",
+    "There's black fungal growth on my rice leaves. Is it serious?",
+)
+
+
+def _shuffled_examples(seed=None) -> deque:
+    """
+    Shuffle the mock examples once; callers then cycle through them.
+
+    Args:
+        seed: Optional RNG seed (MOCK_SEED) for a reproducible order
+
+    Returns:
+        Deque of examples in shuffled order
+    """
+    examples = list(_MOCK_EXAMPLES)
+    random.Random(seed).shuffle(examples)
+    return deque(examples)
+
+
+# Set MOCK_SEED for a reproducible order (e.g. when recording fixtures)
+_mock_seed = os.getenv("MOCK_SEED")
+_mock_queue = _shuffled_examples(int(_mock_seed) if _mock_seed else None)
 
 
 def transcribe_farmer_audio(audio_path: str) -> str:
@@ -37,7 +68,7 @@ def transcribe_farmer_audio(audio_path: str) -> str:
         try:
             return _transcribe_with_groq(audio_path, groq_api_key)
         except Exception as e:
-            logger.warning(f"Groq transcription failed: {e}. Using mock.")
+            logger.warning("Groq transcription failed: %s. Using mock.", e)
     
     # Fallback mock
     logger.info("Using mock transcription (no GROQ_API_KEY or API call failed)")
@@ -56,44 +87,39 @@ def _transcribe_with_groq(audio_path: str, api_key: str) -> str:
         Transcribed text
     """
     try:
-        import requests
+        from utils_http import get_session
         
         with open(audio_path, "rb") as f:
             files = {"file": (os.path.basename(audio_path), f, "audio/wav")}
             headers = {"Authorization": f"Bearer {api_key}"}
             
             url = "https://api.groq.com/openai/v1/audio/transcriptions"
-            resp = requests.post(url, files=files, headers=headers, timeout=30)
+            resp = get_session().post(url, files=files, headers=headers, timeout=30)
             
             if resp.status_code == 200:
                 data = resp.json()
                 text = data.get("text", "")
-                logger.info(f"Groq transcription successful: {len(text)} chars")
+                logger.info("Groq transcription successful: %d chars", len(text))
                 return text
             else:
-                logger.error(f"Groq API error: {resp.status_code}")
+                logger.error("Groq API error: %s", resp.status_code)
                 raise RuntimeError(f"Groq API returned {resp.status_code}")
     except Exception as e:
-        logger.error(f"Error in Groq transcription: {e}")
+        logger.error("Error in Groq transcription: %s", e)
         raise
 
 
 def _mock_transcription() -> str:
     """
-    Return a realistic random mock transcription for testing.
+    Return a realistic mock transcription for testing.
+    Cycles through the pre-shuffled examples, so every one is used before
+    any repeats.
     
     Returns:
         Sample farmer question text
     """
-    examples = [
-        "My tomato leaves have yellow spots after heavy rain. What should I do?",
-        "I see small holes in the leaves and some insects underneath. How do I fix this?",
-        "The soil is very dry and my plants are starting to wilt. I need help.",
-        "There's a white powdery substance on the leaves. Is this a disease?",
-        "My corn plants are yellowing from the bottom. What nutrient are they missing?",
-        "I noticed brown lesions on the cotton leaves that are spreading. What can I do?",
-        "There's black fungal growth on my rice leaves. Is it serious?",
-    ]
-    choice = random.choice(examples)
-    logger.debug(f"Mock transcription selected: {choice[:50]}...")
+    # popleft/append are each atomic, so concurrent callers never share a pick
+    choice = _mock_queue.popleft()
+    _mock_queue.append(choice)
+    logger.debug("Mock transcription selected: %s...", choice[:50])
     return choice
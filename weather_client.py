@@ -8,15 +8,32 @@ Fetches local weather context for agronomy reasoning:
 With caching and retry logic for efficiency.
 """
 
+import asyncio
+import json
+import math
+import operator
 import os
-import requests
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+from config import load_env
 from logging_config import get_logger
+from response_cache import get_weather_cache, make_key
+from utils_http import get_session, mount_retries
 
 logger = get_logger("weather_client")
 
-load_dotenv()
+load_env()
 
 # Configuration
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
@@ -24,16 +41,204 @@ WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
 # Risk thresholds (configurable)
 WEATHER_CONFIG = {
     "CACHE_DURATION_MINUTES": 30,
+    "CACHE_MAX_ENTRIES": 1024,
+    # OneCall "current" data refreshes about every 10 minutes; cache a
+    # reading until its next refresh, but at least MIN_CACHE_SECONDS
+    "OWM_UPDATE_SECONDS": 600,
+    "MIN_CACHE_SECONDS": 60,
+    # Past this fraction of its lifetime a cached snapshot is still served,
+    # but refreshed in the background (stale-while-revalidate)
+    "REFRESH_AHEAD_FRACTION": 0.8,
     "HUMIDITY_HIGH_THRESHOLD": 80,
     "TEMP_HIGH_THRESHOLD": 32,
     "TEMP_LOW_THRESHOLD": 10,
     "RAIN_RISK_THRESHOLD_MM": 0.1,
     "API_TIMEOUT": 10,
+    # OneCall payloads are ~20 KB; anything far larger is a proxy or API fault
+    "MAX_RESPONSE_BYTES": 256 * 1024,
+    # Batch fetches: API calls in flight at once
+    "MAX_CONCURRENT_FETCHES": 10,
     "RETRY_ATTEMPTS": 3,
 }
 
-# Simple in-memory cache
-_weather_cache = {}
+OWM_URL_PREFIX = "https://api.openweathermap.org/"
+OWM_ONECALL_URL = OWM_URL_PREFIX + "data/2.5/onecall"
+_ONECALL_PARAMS = {"exclude": "daily,alerts", "units": "metric"}
+
+# Cache grid: ~1 km cells, keyed by the rounded (lat, lon)
+CACHE_GRID_DECIMALS = 2
+CACHE_GRID_STEP = 10 ** -CACHE_GRID_DECIMALS
+# A neighbouring cell's entry is reused if it was fetched this close by
+NEIGHBOR_TOLERANCE_DEG = CACHE_GRID_STEP
+
+# In-memory LRU cache: cell -> (refresh_at, deadline, lat, lon, data), least
+# recently used first; capped at CACHE_MAX_ENTRIES
+_weather_cache = OrderedDict()
+_weather_cache_lock = threading.Lock()
+
+# Cells being fetched right now: cell -> Future of the leader's result
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_key(lat: float, lon: float) -> Tuple[float, float]:
+    """~1 km precision: nearby requests for the same farm share one entry."""
+    return (round(lat, CACHE_GRID_DECIMALS), round(lon, CACHE_GRID_DECIMALS))
+
+
+def _neighbor_keys(cache_key: Tuple[float, float]):
+    """The 8 cells surrounding a cell."""
+    lat, lon = cache_key
+    for dlat in (-1, 0, 1):
+        for dlon in (-1, 0, 1):
+            if dlat or dlon:
+                yield (
+                    round(lat + dlat * CACHE_GRID_STEP, CACHE_GRID_DECIMALS),
+                    round(lon + dlon * CACHE_GRID_STEP, CACHE_GRID_DECIMALS),
+                )
+
+
+def _cached_entry(
+    cache_key, lat: float, lon: float, tolerance: Optional[float] = None, revalidate: bool = True
+):
+    """
+    Return the live data cached for a cell, dropping it if expired.
+    With a tolerance, only accept it if it was fetched within that many
+    degrees of (lat, lon). With revalidate, an entry past its refresh point
+    is still returned but refreshed in the background.
+    """
+    now = time.monotonic()
+    with _weather_cache_lock:
+        entry = _weather_cache.get(cache_key)
+        if entry is None:
+            return None
+        refresh_at, deadline, cached_lat, cached_lon, cached_data = entry
+        if deadline <= now:
+            logger.debug("Cache expired for %s", cache_key)
+            del _weather_cache[cache_key]
+            return None
+        if tolerance is not None and (
+            abs(cached_lat - lat) > tolerance or abs(cached_lon - lon) > tolerance
+        ):
+            return None
+        _weather_cache.move_to_end(cache_key)
+    logger.debug("Using cached weather for %s (%.0fs left)", cache_key, deadline - now)
+    if revalidate and refresh_at <= now:
+        _refresh_in_background(cache_key, cached_lat, cached_lon)
+    return cached_data
+
+
+def _expires_at(data: dict) -> float:
+    """
+    When a snapshot goes stale: the next upstream refresh after the
+    observation time, clamped to [MIN_CACHE_SECONDS, CACHE_DURATION_MINUTES]
+    from now. Fallback responses (no observation time) use the full duration.
+    """
+    now = time.time()
+    latest = now + WEATHER_CONFIG["CACHE_DURATION_MINUTES"] * 60
+    observed_at = data.get("observed_at")
+    if observed_at is None:
+        return latest
+    refresh_at = observed_at + WEATHER_CONFIG["OWM_UPDATE_SECONDS"]
+    return min(max(refresh_at, now + WEATHER_CONFIG["MIN_CACHE_SECONDS"]), latest)
+
+
+def _disk_key(cache_key: Tuple[float, float]) -> str:
+    """Key of a cell in the on-disk cache."""
+    return make_key("weather", "%s,%s" % cache_key)
+
+
+def _disk_entry(cache_key, lat: float, lon: float):
+    """
+    Look a cell up in the on-disk cache (survives restarts) and promote a
+    live entry to memory.
+    """
+    disk = get_weather_cache()
+    if disk is None:
+        return None
+    entry = disk.get(_disk_key(cache_key))
+    if entry is None or entry["expires_at"] <= time.time():
+        return None
+    logger.debug("Using on-disk weather for %s", cache_key)
+    _store_entry(cache_key, entry["lat"], entry["lon"], entry["data"], entry["expires_at"])
+    return entry["data"]
+
+
+def _store_entry(
+    cache_key, lat: float, lon: float, data: dict, expires_at: Optional[float] = None
+) -> None:
+    """
+    Cache data for a cell, evicting the least recently used cells if full.
+    expires_at is wall-clock (it comes from the API's observation time or
+    the disk cache); in memory it becomes a monotonic deadline, immune to
+    clock jumps.
+    """
+    if expires_at is None:
+        expires_at = _expires_at(data)
+    now = time.monotonic()
+    lifetime = expires_at - time.time()
+    refresh_at = now + lifetime
+    if data.get("observed_at") is not None:
+        # Only real readings refresh ahead; fallbacks just expire
+        refresh_at = now + lifetime * WEATHER_CONFIG["REFRESH_AHEAD_FRACTION"]
+    with _weather_cache_lock:
+        _weather_cache[cache_key] = (refresh_at, now + lifetime, lat, lon, data)
+        _weather_cache.move_to_end(cache_key)
+        while len(_weather_cache) > WEATHER_CONFIG["CACHE_MAX_ENTRIES"]:
+            _weather_cache.popitem(last=False)
+
+
+def _store_on_disk(cache_key, lat: float, lon: float, data: dict) -> None:
+    """
+    Write a real reading through to the on-disk cache. Fallback responses
+    are kept in memory only, so an outage isn't remembered across restarts.
+    """
+    disk = get_weather_cache()
+    if disk is None or data.get("observed_at") is None:
+        return
+    expires_at = _expires_at(data)
+    entry = {"expires_at": expires_at, "lat": lat, "lon": lon, "data": data}
+    try:
+        disk.set(_disk_key(cache_key), entry, ttl_seconds=expires_at - time.time())
+    except Exception as e:
+        logger.warning("Could not persist weather for %s: %s", cache_key, e)
+
+
+def get_cached_snapshot(lat: float, lon: float):
+    """
+    Return the cached weather for a location without fetching.
+    Falls back to a neighbouring cell fetched within NEIGHBOR_TOLERANCE_DEG,
+    so points just across a cell boundary still hit, then to the on-disk
+    cache (warm after a restart). A snapshot near the end of its lifetime
+    is returned as-is and refreshed in the background.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        
+    Returns:
+        Cached weather dictionary, or None if missing or expired
+    """
+    cache_key = _cache_key(lat, lon)
+    cached_data = _memory_lookup(cache_key, lat, lon, revalidate=True)
+    if cached_data is not None:
+        return cached_data
+    return _disk_entry(cache_key, lat, lon)
+
+
+def _memory_lookup(cache_key, lat: float, lon: float, revalidate: bool):
+    """In-memory tier of get_cached_snapshot: the cell, then its neighbours."""
+    cached_data = _cached_entry(cache_key, lat, lon, revalidate=revalidate)
+    if cached_data is not None:
+        return cached_data
+
+    for neighbor in _neighbor_keys(cache_key):
+        cached_data = _cached_entry(
+            neighbor, lat, lon, NEIGHBOR_TOLERANCE_DEG, revalidate=revalidate
+        )
+        if cached_data is not None:
+            return cached_data
+    return None
 
 
 def fetch_weather_snapshot(lat: float, lon: float) -> dict:
@@ -48,33 +253,169 @@ def fetch_weather_snapshot(lat: float, lon: float) -> dict:
     Returns:
         Dictionary with weather data and risk summary
     """
-    cache_key = f"{lat},{lon}"
-    
     # Check cache
-    if cache_key in _weather_cache:
-        cached_time, cached_data = _weather_cache[cache_key]
-        age_minutes = (datetime.now() - cached_time).total_seconds() / 60
+    cached_data = get_cached_snapshot(lat, lon)
+    if cached_data is not None:
+        return cached_data
+
+    # Single-flight: concurrent misses for a cell share one API call
+    cache_key = _cache_key(lat, lon)
+    with _inflight_lock:
+        future = _inflight.get(cache_key)
+        leader = future is None
+        if leader:
+            # Another leader may have stored it since our check. Memory
+            # only: the disk tier was checked above, and its I/O must not
+            # run under the process-wide lock
+            cached_data = _memory_lookup(cache_key, lat, lon, revalidate=False)
+            if cached_data is not None:
+                return cached_data
+            future = _inflight[cache_key] = Future()
+    if not leader:
+        logger.debug("Waiting for in-flight weather fetch for %s", cache_key)
+        return future.result()
+
+    return _fetch_and_store(cache_key, lat, lon, future)
+
+
+def _fetch_and_store(cache_key, lat: float, lon: float, future: Future, keep_live: bool = False) -> dict:
+    """
+    Fetch a cell as the single-flight leader: store the result, hand it to
+    any waiters through future, then leave the in-flight registry.
+    
+    Args:
+        cache_key: Cell being fetched (already registered in _inflight)
+        lat: Latitude
+        lon: Longitude
+        future: The cell's in-flight Future
+        keep_live: Don't replace a cached snapshot with a fallback response
+            (background refresh of data that is still valid)
         
-        if age_minutes < WEATHER_CONFIG["CACHE_DURATION_MINUTES"]:
-            logger.debug(f"Using cached weather for {cache_key} ({age_minutes:.1f}m old)")
-            return cached_data
+    Returns:
+        Dictionary with weather data and risk summary
+    """
+    try:
+        # Fetch fresh data
+        data = _fetch_weather_with_retry(lat, lon)
+
+        # Store in cache
+        if keep_live and data.get("observed_at") is None:
+            logger.debug("Refresh for %s failed; keeping cached weather", cache_key)
+            _postpone_refresh(cache_key)
         else:
-            logger.debug(f"Cache expired for {cache_key}")
-            del _weather_cache[cache_key]
-    
-    # Fetch fresh data
-    data = _fetch_weather_with_retry(lat, lon)
+            _store_entry(cache_key, lat, lon, data)
+            _store_on_disk(cache_key, lat, lon, data)
+            logger.debug("Cached weather for %s", cache_key)
+        future.set_result(data)
+        return data
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(cache_key, None)
+
+
+def _postpone_refresh(cache_key) -> None:
+    """Serve a cell's snapshot until it expires without refreshing it again."""
+    with _weather_cache_lock:
+        entry = _weather_cache.get(cache_key)
+        if entry is not None:
+            _weather_cache[cache_key] = (entry[1],) + entry[1:]
+
+
+def _refresh_in_background(cache_key, lat: float, lon: float) -> None:
+    """Start a background fetch for a cell, unless one is already running."""
+    with _inflight_lock:
+        if cache_key in _inflight:
+            return
+        future = _inflight[cache_key] = Future()
+    logger.debug("Refreshing weather for %s in the background", cache_key)
+    threading.Thread(
+        target=_background_refresh,
+        args=(cache_key, lat, lon, future),
+        name="weather-refresh",
+        daemon=True,
+    ).start()
+
+
+def _background_refresh(cache_key, lat: float, lon: float, future: Future) -> None:
+    """Thread body for _refresh_in_background."""
+    try:
+        _fetch_and_store(cache_key, lat, lon, future, keep_live=True)
+    except Exception as e:
+        logger.warning("Background weather refresh for %s failed: %s", cache_key, e)
+
+
+async def fetch_weather_snapshot_async(lat: float, lon: float) -> dict:
+    """
+    Async version of fetch_weather_snapshot, so callers can gather it with
+    LLM or transcription calls. Cache hits return without leaving the event
+    loop; misses run the blocking fetch (shared session, retries) in a
+    worker thread.
     
-    # Store in cache
-    _weather_cache[cache_key] = (datetime.now(), data)
-    logger.debug(f"Cached weather for {cache_key}")
+    Args:
+        lat: Latitude
+        lon: Longitude
+        
+    Returns:
+        Dictionary with weather data and risk summary
+    """
+    cached_data = get_cached_snapshot(lat, lon)
+    if cached_data is not None:
+        return cached_data
+    return await asyncio.to_thread(fetch_weather_snapshot, lat, lon)
+
+
+async def fetch_weather_snapshots_async(
+    locations: Iterable[Tuple[float, float]], max_concurrent: Optional[int] = None
+) -> List[dict]:
+    """
+    Fetch weather for many locations concurrently. Cached locations are
+    answered without scheduling a fetch; locations that share a cache entry
+    (same ~1 km cell) are fetched once.
     
-    return data
+    Args:
+        locations: (lat, lon) pairs
+        max_concurrent: Most API calls in flight at once (defaults to
+            WEATHER_CONFIG["MAX_CONCURRENT_FETCHES"])
+        
+    Returns:
+        Weather dictionary for each location, in input order
+    """
+    locations = list(locations)
+    if max_concurrent is None:
+        max_concurrent = WEATHER_CONFIG["MAX_CONCURRENT_FETCHES"]
+
+    by_cell = {}
+    # One fetch per uncached cell; the first location seen stands for the cell
+    misses = {}
+    for lat, lon in locations:
+        cache_key = _cache_key(lat, lon)
+        if cache_key in by_cell or cache_key in misses:
+            continue
+        cached_data = get_cached_snapshot(lat, lon)
+        if cached_data is not None:
+            by_cell[cache_key] = cached_data
+        else:
+            misses[cache_key] = (lat, lon)
+
+    if misses:
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+        async def _one(lat: float, lon: float) -> dict:
+            async with semaphore:
+                return await asyncio.to_thread(fetch_weather_snapshot, lat, lon)
+
+        results = await asyncio.gather(*(_one(lat, lon) for lat, lon in misses.values()))
+        by_cell.update(zip(misses, results))
+    return [by_cell[_cache_key(lat, lon)] for lat, lon in locations]
 
 
 def _fetch_weather_with_retry(lat: float, lon: float) -> dict:
     """
-    Fetch weather with retry logic.
+    Fetch weather with retry logic. Retries (with backoff and Retry-After)
+    happen in the session's connection pool; see mount_retries.
     
     Args:
         lat: Latitude
@@ -86,18 +427,15 @@ def _fetch_weather_with_retry(lat: float, lon: float) -> dict:
     if not WEATHER_API_KEY:
         logger.warning("No WEATHER_API_KEY set")
         return _fallback_response("Weather API not configured")
-    
-    for attempt in range(1, WEATHER_CONFIG["RETRY_ATTEMPTS"] + 1):
-        try:
-            logger.debug(f"Fetching weather (attempt {attempt}/{WEATHER_CONFIG['RETRY_ATTEMPTS']})")
-            return _fetch_from_openweathermap(lat, lon)
-        except requests.RequestException as e:
-            logger.warning(f"Weather API attempt {attempt} failed: {e}")
-            if attempt < WEATHER_CONFIG["RETRY_ATTEMPTS"]:
-                continue
-        except Exception as e:
-            logger.error(f"Unexpected error fetching weather: {e}")
-            break
+
+    import requests  # deferred: not needed when no API key is configured
+
+    try:
+        return _fetch_from_openweathermap(lat, lon)
+    except requests.RequestException as e:
+        logger.warning("Weather API request failed: %s", e)
+    except Exception as e:
+        logger.error("Unexpected error fetching weather: %s", e)
     
     return _fallback_response("Weather API unavailable")
 
@@ -113,16 +451,52 @@ def _fetch_from_openweathermap(lat: float, lon: float) -> dict:
     Returns:
         Parsed weather data
     """
-    # Fix URL construction (add missing /)
-    url = (
-        "https://api.openweathermap.org/data/2.5/onecall"
-        f"?lat={lat}&lon={lon}&exclude=daily,alerts&units=metric&appid={WEATHER_API_KEY}"
-    )
+    params = {"lat": lat, "lon": lon, **_ONECALL_PARAMS, "appid": WEATHER_API_KEY}
     
-    resp = requests.get(url, timeout=WEATHER_CONFIG["API_TIMEOUT"])
-    resp.raise_for_status()
+    mount_retries(OWM_URL_PREFIX, WEATHER_CONFIG["RETRY_ATTEMPTS"] - 1)
+    with get_session().get(
+        OWM_ONECALL_URL, params=params, timeout=WEATHER_CONFIG["API_TIMEOUT"], stream=True
+    ) as resp:
+        resp.raise_for_status()
+        body = _read_capped(resp, WEATHER_CONFIG["MAX_RESPONSE_BYTES"])
     
-    return _parse_weather_response(resp.json())
+    return _parse_weather_response(_json_loads(body))
+
+
+def _read_capped(resp, max_bytes: int) -> bytes:
+    """
+    Read a streamed response body, refusing anything over max_bytes so a
+    misbehaving upstream can't make us buffer megabytes.
+    
+    Args:
+        resp: Response opened with stream=True
+        max_bytes: Largest body accepted
+        
+    Returns:
+        Response body
+        
+    Raises:
+        requests.RequestException: If the body is larger than max_bytes
+    """
+    import requests
+
+    declared = resp.headers.get("Content-Length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise requests.RequestException(f"Weather response too large: {declared} bytes")
+
+    body = bytearray()
+    for chunk in resp.iter_content(chunk_size=16 * 1024):
+        body += chunk
+        if len(body) > max_bytes:
+            raise requests.RequestException(f"Weather response larger than {max_bytes} bytes")
+    return bytes(body)
+
+
+def _json_loads(raw: bytes):
+    """Decode a JSON response body (orjson when installed, else stdlib)."""
+    if _HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def _parse_weather_response(data: dict) -> dict:
@@ -136,6 +510,7 @@ def _parse_weather_response(data: dict) -> dict:
         Formatted weather dictionary
     """
     current = data.get("current", {})
+    observed_at = current.get("dt")     # Unix seconds
     humidity = current.get("humidity")  # %
     temp_c = current.get("temp")        # °C
 
@@ -148,7 +523,7 @@ def _parse_weather_response(data: dict) -> dict:
     rain_next_hour = None
     minutely = data.get("minutely", [])
     if minutely:
-        rain_next_hour = sum(p.get("precipitation", 0.0) for p in minutely[:60])
+        rain_next_hour = math.fsum(p.get("precipitation", 0.0) for p in minutely[:60])
 
     # Build agronomy-friendly risk summary
     risks = _assess_weather_risks(humidity, temp_c, rain_last_hour, rain_next_hour)
@@ -159,12 +534,29 @@ def _parse_weather_response(data: dict) -> dict:
         "rain_mm_last_hour": rain_last_hour,
         "rain_mm_next_hour": rain_next_hour,
         "summary_text": " ".join(risks) if risks else "No major immediate weather stress.",
+        "observed_at": observed_at,
     }
 
 
-def _assess_weather_risks(humidity, temp_c, rain_last_hour, rain_next_hour) -> list:
+# Weather risk rules, in output order:
+# (reading index in (humidity, temp_c, rain_last_hour, rain_next_hour),
+#  comparison, WEATHER_CONFIG threshold key, message)
+_RISK_RULES = (
+    (0, operator.ge, "HUMIDITY_HIGH_THRESHOLD", "High humidity can increase fungal disease risk."),
+    (2, operator.gt, "RAIN_RISK_THRESHOLD_MM", "It recently rained, leaves may be wet."),
+    (3, operator.gt, "RAIN_RISK_THRESHOLD_MM", "More rain likely soon, sprays may wash off."),
+    (1, operator.ge, "TEMP_HIGH_THRESHOLD", "High heat can stress plants and burn leaves if sprayed mid-day."),
+    (1, operator.le, "TEMP_LOW_THRESHOLD", "Low temperature can slow nutrient uptake."),
+)
+
+
+@lru_cache(maxsize=512)
+def _assess_weather_risks(humidity, temp_c, rain_last_hour, rain_next_hour) -> Tuple[str, ...]:
     """
     Assess weather-based disease and stress risks.
+    Memoized on the exact readings; clear_cache() resets it (e.g. after
+    changing WEATHER_CONFIG thresholds). Missing readings (None) raise no
+    risk; zero is a real reading (0 °C is cold).
     
     Args:
         humidity: Humidity percentage
@@ -173,26 +565,14 @@ def _assess_weather_risks(humidity, temp_c, rain_last_hour, rain_next_hour) -> l
         rain_next_hour: Forecasted rain in mm (next hour)
         
     Returns:
-        List of risk messages
+        Tuple of risk messages
     """
-    risks = []
-    
-    if humidity and humidity >= WEATHER_CONFIG["HUMIDITY_HIGH_THRESHOLD"]:
-        risks.append("High humidity can increase fungal disease risk.")
-    
-    if rain_last_hour and rain_last_hour > WEATHER_CONFIG["RAIN_RISK_THRESHOLD_MM"]:
-        risks.append("It recently rained, leaves may be wet.")
-    
-    if rain_next_hour and rain_next_hour > WEATHER_CONFIG["RAIN_RISK_THRESHOLD_MM"]:
-        risks.append("More rain likely soon, sprays may wash off.")
-    
-    if temp_c and temp_c >= WEATHER_CONFIG["TEMP_HIGH_THRESHOLD"]:
-        risks.append("High heat can stress plants and burn leaves if sprayed mid-day.")
-    
-    if temp_c and temp_c <= WEATHER_CONFIG["TEMP_LOW_THRESHOLD"]:
-        risks.append("Low temperature can slow nutrient uptake.")
-    
-    return risks
+    readings = (humidity, temp_c, rain_last_hour, rain_next_hour)
+    return tuple(
+        message
+        for index, compare, threshold, message in _RISK_RULES
+        if readings[index] is not None and compare(readings[index], WEATHER_CONFIG[threshold])
+    )
 
 
 def _fallback_response(reason: str = "") -> dict:
@@ -206,7 +586,7 @@ def _fallback_response(reason: str = "") -> dict:
         Default weather response
     """
     message = reason or "Weather data unavailable."
-    logger.warning(f"Weather fallback: {message}")
+    logger.warning("Weather fallback: %s", message)
     
     return {
         "humidity": None,
@@ -214,11 +594,16 @@ def _fallback_response(reason: str = "") -> dict:
         "rain_mm_last_hour": None,
         "rain_mm_next_hour": None,
         "summary_text": message,
+        "observed_at": None,
     }
 
 
 def clear_cache() -> None:
-    """Clear cached weather data (useful for testing)."""
-    global _weather_cache
-    _weather_cache.clear()
+    """Clear cached weather data, in memory and on disk (useful for testing)."""
+    with _weather_cache_lock:
+        _weather_cache.clear()
+    disk = get_weather_cache()
+    if disk is not None:
+        disk.clear()
+    _assess_weather_risks.cache_clear()
     logger.debug("Weather cache cleared")